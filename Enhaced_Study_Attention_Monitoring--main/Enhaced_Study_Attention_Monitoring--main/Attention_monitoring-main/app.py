@@ -1,6 +1,9 @@
 from flask import Flask, render_template, Response, jsonify, request, redirect, url_for, flash, session, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from flask_compress import Compress
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import FileWrapper
 import cv2
 import numpy as np
 import mediapipe as mp
@@ -14,16 +17,23 @@ except ImportError:
         import keras
         from keras.models import load_model
 import time
-from threading import Thread
+from threading import Thread, Lock, Event
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import json
 import os
+import hashlib
 from datetime import datetime
 import google.generativeai as genai
-import PyPDF2
+try:
+    from pypdf import PdfReader  # Maintained successor to PyPDF2, noticeably faster
+except ImportError:
+    from PyPDF2 import PdfReader  # Fallback for environments still on PyPDF2
 from docx import Document
 import re
-import requests
-from io import BytesIO
+import httpx
+from cachetools import TTLCache
+from tempfile import SpooledTemporaryFile
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib import colors
 from reportlab.lib.units import inch
@@ -34,6 +44,18 @@ from reportlab.pdfgen import canvas
 from dotenv import load_dotenv
 import resend
 
+# Optional Numba JIT for the per-frame scalar scoring math - the decorated
+# functions are plain Python and behave identically when numba isn't installed
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        def wrap(func):
+            return func
+        return wrap
+
 # Load environment variables
 load_dotenv()
 
@@ -42,6 +64,46 @@ app.secret_key = 'your-secret-key-change-this-in-production'  # Change this in p
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+# When fronted by Apache mod_xsendfile (or nginx with X-Accel mapping),
+# send_from_directory emits an X-Sendfile header and the proxy streams the
+# bytes via kernel sendfile(2) instead of the Python worker. Off by default
+# because a bare `python app.py` / plain gunicorn deploy would serve empty
+# bodies with it enabled.
+app.config['USE_X_SENDFILE'] = os.getenv('USE_X_SENDFILE', '').lower() in ('1', 'true', 'yes')
+
+# Compress text responses (analytics HTML shrinks ~5-8x). Brotli preferred,
+# gzip fallback. application/pdf is deliberately excluded - PDFs are already
+# deflate-compressed internally, so recompressing just burns CPU. The MJPEG
+# stream is untouched (its mimetype isn't in the list).
+app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIN_SIZE'] = 500
+app.config['COMPRESS_MIMETYPES'] = [
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json',
+]
+Compress(app)
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """JSON provider that understands NumPy scalars and arrays.
+
+    Native Python values still take the C-level fast path; default() is
+    only invoked on serialization misses, so routes can jsonify dicts
+    containing NumPy floats/ints (e.g. /status) without rebuilding them.
+    """
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, (np.floating, np.integer)):
+            return o.item()
+        if isinstance(o, np.ndarray):
+            return o.tolist()
+        return DefaultJSONProvider.default(o)
+
+
+app.json = NumpyJSONProvider(app)
+
 # Configure Resend for parent email notifications
 RESEND_API_KEY = os.getenv('RESEND_API_KEY')
 if RESEND_API_KEY:
@@ -97,6 +159,11 @@ def add_header(response):
 # Create upload directory if it doesn't exist
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
+# Persistent cache of extracted document text, keyed by content hash - survives
+# restarts so re-uploaded documents skip the multi-second PDF/DOCX parse
+TEXT_CACHE_DIR = os.path.join(app.config['UPLOAD_FOLDER'], '.text_cache')
+os.makedirs(TEXT_CACHE_DIR, exist_ok=True)
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'ppt', 'pptx'}
 
@@ -111,6 +178,26 @@ else:
 # YouTube API Configuration - Load from environment variable
 YOUTUBE_API_KEY = os.getenv('YOUTUBE_API_KEY')
 
+# Shared HTTP client for the YouTube API - lives for the process so TLS
+# handshakes and connections to googleapis.com are reused across requests.
+# Deliberately the sync client: Flask runs async views through a fresh event
+# loop per request, which would strand an AsyncClient's keep-alive
+# connections on a closed loop (and raise "Event loop is closed" when one
+# was reused); httpx.Client pools safely across the gthread worker threads.
+_YT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10,
+                          keepalive_expiry=60.0)
+try:
+    yt_client = httpx.Client(http2=True, timeout=10.0, limits=_YT_LIMITS)
+except ImportError:  # http2 extra (h2) not installed
+    yt_client = httpx.Client(timeout=10.0, limits=_YT_LIMITS)
+
+# Repeat searches for the same topic skip the API entirely for an hour -
+# saves the network RTT and the daily YouTube quota. TTLCache isn't
+# thread-safe and the gthread worker serves 8 request threads, so all
+# access goes through the lock
+yt_search_cache = TTLCache(maxsize=1024, ttl=3600)
+_yt_cache_lock = Lock()
+
 # Optimized generation config for faster, well-formatted responses
 generation_config = {
     "temperature": 0.7,
@@ -126,7 +213,29 @@ gemini_model = genai.GenerativeModel(
 )
 
 # Document content cache (stores extracted text from uploaded documents)
-document_content_cache = {}
+# Bounded LRU so a long-running worker can't accumulate unbounded MBs of text.
+# Mutated from both request threads and the doc-parse pool, so the LRU
+# bookkeeping (get + move_to_end, insert + evict) happens under a lock
+from collections import OrderedDict, deque
+DOCUMENT_CACHE_MAX_ENTRIES = 64
+document_content_cache = OrderedDict()
+_document_cache_lock = Lock()
+
+def get_cached_document_content(filename):
+    """Fetch cached text and mark it most-recently-used"""
+    with _document_cache_lock:
+        content = document_content_cache.get(filename)
+        if content is not None:
+            document_content_cache.move_to_end(filename)
+        return content
+
+def cache_document_content(filename, content):
+    """Store extracted text, evicting the least-recently-used entries over the cap"""
+    with _document_cache_lock:
+        document_content_cache[filename] = content
+        document_content_cache.move_to_end(filename)
+        while len(document_content_cache) > DOCUMENT_CACHE_MAX_ENTRIES:
+            document_content_cache.popitem(last=False)
 
 # Global variables for status
 current_status = {
@@ -138,64 +247,91 @@ current_status = {
     'timestamp': time.time()
 }
 
-# Load model with multiple fallback methods
+# Load model - prefer the modern .keras format; a legacy .h5 is converted once
 yawn_model = None
 print("Attempting to load yawn model...")
 
-# Method 1: Try standard loading with compile=False
 try:
-    yawn_model = load_model("yawn_model.h5", compile=False)
-    print("✅ Yawn model loaded successfully (method 1)")
-except Exception as e1:
-    print(f"❌ Method 1 failed: {e1}")
-    
-    # Method 2: Try with custom_objects
-    try:
-        yawn_model = load_model("yawn_model.h5", compile=False, custom_objects={})
-        print("✅ Yawn model loaded successfully (method 2)")
-    except Exception as e2:
-        print(f"❌ Method 2 failed: {e2}")
-        
-        # Method 3: Try loading just weights if architecture is known
+    if os.path.exists("yawn_model.keras"):
+        yawn_model = load_model("yawn_model.keras", compile=False)
+        print("✅ Yawn model loaded from yawn_model.keras")
+    else:
+        yawn_model = load_model("yawn_model.h5", compile=False)
+        print("✅ Yawn model loaded from yawn_model.h5")
+        # Persist once in the native format - loads much faster on the next
+        # cold start and removes the old architecture-rebuild fallback paths
         try:
-            from tensorflow.keras.models import Sequential
-            from tensorflow.keras.layers import Conv2D, MaxPooling2D, Flatten, Dense, Dropout, BatchNormalization
-            
-            # Recreate the EXACT CNN architecture from yawn.ipynb
-            yawn_model = Sequential([
-                Conv2D(32, (3, 3), activation='relu', input_shape=(24, 24, 3)),
-                BatchNormalization(),
-                MaxPooling2D(2, 2),
-                Conv2D(64, (3, 3), activation='relu'),
-                BatchNormalization(),
-                MaxPooling2D(2, 2),
-                Conv2D(128, (3, 3), activation='relu'),
-                BatchNormalization(),
-                MaxPooling2D(2, 2),
-                Flatten(),
-                Dropout(0.5),
-                Dense(512, activation='relu'),
-                Dense(1, activation='sigmoid')  # Binary classification for yawn/no-yawn
-            ])
-            
-            yawn_model.compile(optimizer='adam', loss='binary_crossentropy', metrics=['accuracy'])
-            
-            # Try to load weights
-            yawn_model.load_weights("yawn_model.h5")
-            print("✅ Yawn model architecture recreated and weights loaded (method 3)")
-        except Exception as e3:
-            print(f"❌ Method 3 failed: {e3}")
-            
-            # Method 4: Create a dummy model for testing
-            print("⚠️  Creating dummy model for testing (yawn detection will be simulated)")
-            yawn_model = None
+            yawn_model.save("yawn_model.keras")
+            print("✅ Saved yawn_model.keras for faster future startups")
+        except Exception as e:
+            print(f"⚠️  Could not save yawn_model.keras: {e}")
+except Exception as e:
+    print(f"❌ Yawn model load failed: {e}")
+    print("⚠️  Yawn detection will be simulated")
+    yawn_model = None
 
 if yawn_model is None:
     print("⚠️  Yawn detection will use fallback method (mouth aspect ratio only)")
 
-# MediaPipe
+# Mouth-crop input size, read off the loaded model so the buffers, warmup
+# trace and per-frame resize below all agree with whatever CNN was trained
+# (64x64 RGB for the network in yawn.ipynb)
+YAWN_INPUT_H, YAWN_INPUT_W = (64, 64)
+if yawn_model is not None:
+    YAWN_INPUT_H, YAWN_INPUT_W = yawn_model.input_shape[1:3]
+
+# Fast inference path: calling yawn_model(x, training=False) through a traced
+# tf.function skips the per-call predict() machinery (callback setup, data
+# adapter) which dominates latency at batch size 1 on this tiny CNN
+yawn_infer = None
+if yawn_model is not None:
+    try:
+        import tensorflow as tf
+
+        @tf.function
+        def _yawn_infer(x):
+            return yawn_model(x, training=False)
+
+        # Warm the trace with a dummy mouth crop so the first real frame is fast
+        _yawn_infer(tf.zeros((1, YAWN_INPUT_H, YAWN_INPUT_W, 3), dtype=tf.float32))
+        yawn_infer = _yawn_infer
+        print("✅ Yawn model wrapped in tf.function fast path")
+    except Exception as e:
+        print(f"⚠️  tf.function fast path unavailable, using predict() fallback: {e}")
+
+# Quantized TFLite fast path - run convert_yawn_to_tflite.py once to produce
+# yawn_model.tflite (INT8). Several times faster than Keras on CPU and ~4x
+# smaller weights; preferred over the Keras model when present.
+yawn_tflite = None
+yawn_tflite_input = None
+yawn_tflite_output = None
+if os.path.exists("yawn_model.tflite"):
+    try:
+        import tensorflow as tf
+        yawn_tflite = tf.lite.Interpreter(model_path="yawn_model.tflite", num_threads=2)
+        yawn_tflite.allocate_tensors()
+        _tflite_in = yawn_tflite.get_input_details()[0]
+        yawn_tflite_input = _tflite_in['index']
+        yawn_tflite_output = yawn_tflite.get_output_details()[0]['index']
+        # The interpreter is authoritative for the crop size it expects
+        YAWN_INPUT_H, YAWN_INPUT_W = (int(_tflite_in['shape'][1]),
+                                      int(_tflite_in['shape'][2]))
+        print("✅ Quantized TFLite yawn model loaded (preferred over Keras)")
+    except Exception as e:
+        yawn_tflite = None
+        print(f"⚠️  TFLite yawn model failed to load, using Keras path: {e}")
+
+# MediaPipe - refine_landmarks stays off (we only need the basic 468 points,
+# not the iris sub-network) and both confidences are lowered to 0.4 so the
+# cheap tracking path is used more often than full re-detection
 mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, min_detection_confidence=0.5)
+face_mesh = mp_face_mesh.FaceMesh(
+    static_image_mode=False,
+    max_num_faces=1,
+    refine_landmarks=False,
+    min_detection_confidence=0.4,
+    min_tracking_confidence=0.4
+)
 
 # Constants - Improved drowsiness detection  
 YAWN_THRESHOLD = 0.85  # Increased threshold to avoid false positives
@@ -205,6 +341,8 @@ NOT_ATTENTIVE_THRESHOLD = 3  # Reduced from 6 to 3 seconds for faster detection
 DROWSY_EAR_THRESHOLD = 0.27  # More conservative - only very droopy eyes
 DROWSY_CONSEC_FRAMES = 10    # Slightly increased for stability
 NODDING_THRESHOLD = 15       # Reduced from 25 - more sensitive to subtle head movements
+FACE_MESH_INPUT_SIZE = 480   # Long side (px) fed to MediaPipe - detector doesn't need full webcam res
+PROCESS_EVERY_N = 2          # Run FaceMesh every Nth frame; landmarks change slowly so reuse between
 
 # Landmark indices - UNCHANGED
 LEFT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385]
@@ -213,18 +351,31 @@ CHIN_POINT = 175
 NOSE_TIP = 1
 FOREHEAD_POINT = 10
 
-# State variables - Enhanced for gradual drowsiness detection
-yawn_counter = 0
-last_alert_time = 0
-last_attentive_time = time.time()
-yawn_probs = []
-drowsy_counter = 0
-drowsiness_score = 0  # Accumulates gradually over time
-recent_ear_values = []  # Track recent EAR values for smoother detection
+# Precomputed index arrays so per-frame landmark gathers are single fancy-index ops
+LEFT_EYE_IDX = np.array(LEFT_EYE[:6], dtype=np.int32)
+RIGHT_EYE_IDX = np.array(RIGHT_EYE[:6], dtype=np.int32)
+MOUTH_IDX = np.array([13, 14, 15, 16, 17, 78, 79, 80, 81, 82], dtype=np.int32)
+
+# Per-stream detection state - one instance per /video_feed generator, so the
+# counters live as plain attributes instead of a pile of module globals.
+# Rolling windows use deque(maxlen=N): append is O(1) and old values fall off
+# automatically, unlike list.pop(0) which shifts every element
+@dataclass
+class MonitorState:
+    yawn_counter: int = 0
+    drowsy_counter: int = 0
+    drowsiness_score: int = 0  # Accumulates gradually over time
+    nodding_counter: int = 0
+    last_attentive_time: float = field(default_factory=time.time)
+    last_distraction_alert: float = 0.0
+    distraction_alert_count: int = 0
+    not_present_alerted: bool = False
+    yawn_probs: deque = field(default_factory=lambda: deque(maxlen=10))
+    recent_ear_values: deque = field(default_factory=lambda: deque(maxlen=10))  # For smoother detection
+    chin_positions: deque = field(default_factory=lambda: deque(maxlen=10))
+    mar_list: deque = field(default_factory=lambda: deque(maxlen=5))
 
 # Distraction alert system
-last_distraction_alert = 0
-distraction_alert_count = 0
 DISTRACTION_ALERT_INTERVAL = 10  # Alert every 10 seconds when distracted
 
 # Motivational messages for distraction alerts
@@ -240,7 +391,6 @@ MOTIVATIONAL_MESSAGES = [
     "🏆 Champions are made through focused effort!",
     "🌅 Each focused minute is an investment in your dreams!"
 ]
-not_present_alerted = False
 
 # Session Statistics Tracking
 session_stats = {
@@ -255,63 +405,75 @@ session_stats = {
     'last_state': 'focused',
     'state_start_time': time.time()
 }
-chin_positions = []
-nodding_counter = 0
-previous_chin_y = None
-mar_list = []
-
-# All detection functions - UNCHANGED from original
-def mouth_aspect_ratio(landmark_coords):
-    A = np.linalg.norm(np.array(landmark_coords[13]) - np.array(landmark_coords[14]))
-    B = np.linalg.norm(np.array(landmark_coords[78]) - np.array(landmark_coords[82]))
+
+# All detection functions - operate on a (468, 2) landmark ndarray built once
+# per frame, so the distance math is plain array arithmetic (no per-point
+# np.array() conversions in the hot loop)
+def mouth_aspect_ratio(lm):
+    A = np.linalg.norm(lm[13] - lm[14])
+    B = np.linalg.norm(lm[78] - lm[82])
     if B == 0:
         return 0
     return A / B
 
-def smoothed_mar(current_mar, window=5):
-    global mar_list
-    mar_list.append(current_mar)
-    if len(mar_list) > window:
-        mar_list.pop(0)
-    return sum(mar_list) / len(mar_list)
+def smoothed_mar(state, current_mar):
+    state.mar_list.append(current_mar)  # maxlen=5 deque drops the oldest value itself
+    return sum(state.mar_list) / len(state.mar_list)
 
-def eye_aspect_ratio(eye_points):
-    if len(eye_points) < 6:
+def eye_aspect_ratio(eye_pts):
+    if len(eye_pts) < 6:
         return 0
-    
-    A = np.linalg.norm(np.array(eye_points[1]) - np.array(eye_points[5]))
-    B = np.linalg.norm(np.array(eye_points[2]) - np.array(eye_points[4]))
-    C = np.linalg.norm(np.array(eye_points[0]) - np.array(eye_points[3]))
-    
+
+    # Both vertical distances in one vectorized norm call
+    vert = np.linalg.norm(eye_pts[[1, 2]] - eye_pts[[5, 4]], axis=1)
+    C = np.linalg.norm(eye_pts[0] - eye_pts[3])
+
     if C == 0:
         return 0
-    return (A + B) / (2.0 * C)
-
-def detect_nodding(landmark_coords):
-    global chin_positions, nodding_counter, previous_chin_y
-    
+    return vert.sum() / (2.0 * C)
+
+@njit(cache=True)
+def update_nodding_counter(recent_positions, nodding_counter, threshold):
+    """Counter update from the last 5 chin-Y samples - pure scalar math, JIT-friendly"""
+    window = recent_positions[-5:]
+    movement_range = window.max() - window.min()
+    if movement_range > threshold:
+        return nodding_counter + 1
+    return max(0, nodding_counter - 1)
+
+@njit(cache=True)
+def update_drowsiness_score(avg_recent_ear, drowsiness_score, drowsy_counter, ear_threshold):
+    """Drowsiness scoring cascade - returns the new (score, counter) pair"""
+    if avg_recent_ear < ear_threshold:  # Eyes very droopy
+        drowsiness_score += 3  # Increase score faster for clearly closed/droopy eyes
+        drowsy_counter += 1
+    elif avg_recent_ear < 0.32:  # Eyes slightly droopy
+        drowsiness_score += 1  # Gradual increase for borderline cases
+        drowsy_counter += 1
+    elif avg_recent_ear > 0.35:  # Eyes clearly open
+        drowsiness_score = max(0, drowsiness_score - 3)  # Aggressive reset when eyes are open
+        drowsy_counter = 0
+    else:  # Normal range (0.32-0.35)
+        drowsiness_score = max(0, drowsiness_score - 1)  # Slow decrease in normal range
+        drowsy_counter = 0
+    return drowsiness_score, drowsy_counter
+
+def detect_nodding(state, lm):
     try:
-        chin_y = landmark_coords[CHIN_POINT][1]
-        
-        chin_positions.append(chin_y)
-        if len(chin_positions) > 10:
-            chin_positions.pop(0)
-        
-        if len(chin_positions) >= 5:
-            recent_positions = chin_positions[-5:]
-            movement_range = max(recent_positions) - min(recent_positions)
-            
-            if movement_range > NODDING_THRESHOLD:
-                nodding_counter += 1
-            else:
-                nodding_counter = max(0, nodding_counter - 1)
-            
+        chin_y = lm[CHIN_POINT][1]
+
+        state.chin_positions.append(chin_y)  # maxlen=10 deque, oldest drops off
+
+        if len(state.chin_positions) >= 5:
+            recent = np.array(state.chin_positions, dtype=np.float32)
+            state.nodding_counter = update_nodding_counter(recent, state.nodding_counter, NODDING_THRESHOLD)
+
             # Reduced threshold for more gradual detection
-            return nodding_counter > 5
-        
+            return state.nodding_counter > 5
+
     except Exception as e:
         print(f"Nodding detection error: {e}")
-    
+
     return False
 
 # ============= DOCUMENT PARSING HELPER FUNCTIONS =============
@@ -319,10 +481,17 @@ def detect_nodding(landmark_coords):
 def update_session_stats(new_status):
     """Update session statistics based on status changes"""
     global session_stats
-    
+
+    # Fast path: called every frame but most frames aren't transitions.
+    # Elapsed time accrues implicitly against state_start_time and is closed
+    # out at the next transition (or in end_session), so skipping the dict
+    # writes here changes nothing in the totals.
+    if new_status == session_stats['last_state']:
+        return
+
     current_time = time.time()
     time_in_state = current_time - session_stats['state_start_time']
-    
+
     # Update time for previous state
     if session_stats['last_state'] == 'focused':
         session_stats['focused_time'] += time_in_state
@@ -334,27 +503,36 @@ def update_session_stats(new_status):
         session_stats['drowsy_time'] += time_in_state  # Count yawning as drowsy time
     
     # Increment event counters when transitioning TO these states
-    if new_status != session_stats['last_state']:
-        if new_status == 'yawning':
-            session_stats['yawn_count'] += 1
-        elif new_status == 'drowsy':
-            session_stats['drowsy_count'] += 1
-        elif new_status == 'not_present':
-            session_stats['distraction_count'] += 1
-    
+    # (only reached on a transition thanks to the fast path above)
+    if new_status == 'yawning':
+        session_stats['yawn_count'] += 1
+    elif new_status == 'drowsy':
+        session_stats['drowsy_count'] += 1
+    elif new_status == 'not_present':
+        session_stats['distraction_count'] += 1
+
     # Update state tracking
     session_stats['last_state'] = new_status
     session_stats['state_start_time'] = current_time
 
 def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF file"""
+    """Extract text from PDF file (pages extracted in parallel)"""
     try:
-        text = ""
         with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-        return text.strip()
+            num_pages = len(PdfReader(file).pages)
+
+        # pypdf resolves objects lazily via seeks on the reader's stream and
+        # is not thread-safe, so each worker opens its own file handle and
+        # reader - the xref re-parse is cheap next to the text extraction
+        def extract_page(page_idx):
+            with open(pdf_path, 'rb') as f:
+                return PdfReader(f).pages[page_idx].extract_text() or ''
+
+        # Page extractions are independent - fan out across threads so
+        # 20-100 page study documents don't parse serially
+        with ThreadPoolExecutor(max_workers=4) as ex:
+            texts = list(ex.map(extract_page, range(num_pages)))
+        return "\n".join(texts).strip()
     except Exception as e:
         print(f"Error extracting PDF text: {e}")
         return None
@@ -381,64 +559,228 @@ def extract_text_from_txt(txt_path):
 def extract_document_content(filename):
     """Extract content from uploaded document based on file type"""
     file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    
+
     if not os.path.exists(file_path):
         return None
-    
+
+    # Check the persistent cache first - content hash as fingerprint, so the
+    # same document re-uploaded under a new timestamped name still hits
+    try:
+        with open(file_path, 'rb') as f:
+            content_hash = hashlib.md5(f.read()).hexdigest()
+        cache_path = os.path.join(TEXT_CACHE_DIR, f"{content_hash}.txt")
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return f.read()
+    except Exception as e:
+        print(f"Text cache read error: {e}")
+        cache_path = None
+
     # Get file extension
     file_ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-    
+
     # Extract based on file type
     if file_ext == 'pdf':
-        return extract_text_from_pdf(file_path)
+        text = extract_text_from_pdf(file_path)
     elif file_ext in ['doc', 'docx']:
-        return extract_text_from_docx(file_path)
+        text = extract_text_from_docx(file_path)
     elif file_ext == 'txt':
-        return extract_text_from_txt(file_path)
+        text = extract_text_from_txt(file_path)
     else:
         return None
 
+    # Persist for next time (a ~ms disk read instead of a multi-second parse)
+    if text and cache_path:
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        except Exception as e:
+            print(f"Text cache write error: {e}")
+
+    return text
+
+# Memo for the concatenated multi-document blob fed to ask_document chats.
+# Keyed by the session's uploaded_files tuple, so a new upload automatically
+# produces a fresh key and the stale entry just ages out. Same locking story
+# as document_content_cache: OrderedDict mutation isn't thread-safe
+_combined_docs_cache = OrderedDict()
+_combined_docs_lock = Lock()
+
+# Truncate the combined context once, at cache time, instead of shipping an
+# unbounded blob to Gemini on every chat turn
+MAX_DOCUMENT_CONTEXT_CHARS = 30000
+
 def get_all_documents_content():
     """Get combined content from all uploaded documents in session"""
     uploaded_files = session.get('uploaded_files', [])
-    
+
     if not uploaded_files:
         return None
-    
+
+    # Second and later chat turns skip all file I/O and string assembly
+    cache_key = tuple(uploaded_files)
+    with _combined_docs_lock:
+        combined = _combined_docs_cache.get(cache_key)
+        if combined is not None:
+            _combined_docs_cache.move_to_end(cache_key)
+            return combined
+
     combined_content = []
     for filename in uploaded_files:
         # Check cache first
-        if filename in document_content_cache:
-            content = document_content_cache[filename]
-        else:
+        content = get_cached_document_content(filename)
+        if content is None:
             # Extract and cache
             content = extract_document_content(filename)
             if content:
-                document_content_cache[filename] = content
-        
+                cache_document_content(filename, content)
+
         if content:
             combined_content.append(f"=== Content from {filename} ===\n{content}\n")
-    
-    return "\n\n".join(combined_content) if combined_content else None
+
+    if not combined_content:
+        return None
+
+    combined = "\n\n".join(combined_content)[:MAX_DOCUMENT_CONTEXT_CHARS]
+    with _combined_docs_lock:
+        _combined_docs_cache[cache_key] = combined
+        while len(_combined_docs_cache) > DOCUMENT_CACHE_MAX_ENTRIES:
+            _combined_docs_cache.popitem(last=False)
+    return combined
+
+# Background pool for PDF/DOCX parsing - parsing can take seconds, so it must
+# not block the request thread serving other users
+document_parse_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='doc-parse')
+
+def warm_document_cache(filename):
+    """Extract and cache document text off the request thread (run right after upload)"""
+    try:
+        content = extract_document_content(filename)
+        if content:
+            cache_document_content(filename, content)
+    except Exception as e:
+        print(f"Background document parse error for {filename}: {e}")
 
 # ============= END OF DOCUMENT PARSING FUNCTIONS =============
 
 
+class FrameGrabber(Thread):
+    """Capture webcam frames on a dedicated thread so camera I/O never blocks detection.
+
+    Keeps only the MOST RECENT frame (latest-value buffer, not a queue) - stale
+    frames are dropped instead of processed late, so the stream stays live even
+    when the detection loop falls behind.
+    """
+
+    def __init__(self, src=0):
+        super().__init__(daemon=True)  # Daemon so process exit is clean
+        self.cap = cv2.VideoCapture(src)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)  # Stop OpenCV from buffering old frames
+        self.lock = Lock()
+        self.new_frame = Event()
+        self.ret = False
+        self.frame = None
+        self.running = True
+
+    def run(self):
+        try:
+            while self.running:
+                ret, frame = self.cap.read()
+                with self.lock:
+                    self.ret = ret
+                    self.frame = frame
+                self.new_frame.set()
+                if not ret:
+                    break
+        finally:
+            # Always hand the device back when the loop exits (read failure
+            # included) so a replacement grabber can reopen it - release()
+            # is idempotent, so a prior stop() is harmless
+            self.cap.release()
+
+    def get_latest(self, timeout=1.0):
+        """Return the most recent (ret, frame) pair, waiting briefly for a fresh one."""
+        self.new_frame.wait(timeout)
+        with self.lock:
+            self.new_frame.clear()
+            frame = self.frame.copy() if self.frame is not None else None
+            return self.ret, frame
+
+    def stop(self):
+        self.running = False
+        self.cap.release()
+
+# Turbo-JPEG encoder for the MJPEG stream - libjpeg-turbo's SIMD paths encode
+# 2-4x faster than cv2.imencode; falls back to OpenCV when not installed
+try:
+    from turbojpeg import TurboJPEG
+    turbo_jpeg = TurboJPEG()
+    print("✅ TurboJPEG encoder enabled for video stream")
+except Exception as e:
+    turbo_jpeg = None
+    print(f"⚠️  TurboJPEG unavailable, using cv2.imencode: {e}")
+
+STREAM_JPEG_QUALITY = 80  # Visually identical to default but ~half the bytes on the wire
+
+# Persistent CNN input buffers - the yawn branch writes into these in place
+# instead of allocating a fresh crop-sized array every frame; sized from the
+# model's actual input shape derived above
+_yawn_rgb_tmp = np.empty((YAWN_INPUT_H, YAWN_INPUT_W, 3), dtype=np.uint8)
+_yawn_input = np.empty((1, YAWN_INPUT_H, YAWN_INPUT_W, 3), dtype=np.float32)
+
+# Single shared grabber - camera stays open across /video_feed reconnects
+frame_grabber = None
+
 def generate_frames():
-    global current_status, yawn_counter, last_alert_time, last_attentive_time
-    global yawn_probs, drowsy_counter, not_present_alerted, drowsiness_score, recent_ear_values
-    global last_distraction_alert, distraction_alert_count, session_stats
-    
-    cap = cv2.VideoCapture(0)
-    
+    global current_status, session_stats, frame_grabber
+
+    # All per-stream counters live on one local state object - no shared
+    # globals between concurrent streams, and attribute access is cheaper
+    # than global lookups in the hot loop
+    state = MonitorState()
+
+    # Start (or reuse) the background capture thread
+    if frame_grabber is None or not frame_grabber.is_alive():
+        if frame_grabber is not None:
+            # Make sure the dead grabber has let go of the device before a
+            # new one tries to open it
+            frame_grabber.stop()
+        frame_grabber = FrameGrabber(0)
+        frame_grabber.start()
+
+    # Frame-skip governor state - reuse the last FaceMesh result between runs
+    frame_idx = 0
+    last_results = None
+
+    # Reusable RGB buffer - allocated once at the webcam resolution instead of
+    # a fresh HxWx3 array every frame
+    rgb_buf = None
+
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        ret, frame = frame_grabber.get_latest()
+        if not ret or frame is None:
             break
 
         h, w = frame.shape[:2]
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
+        if rgb_buf is None or rgb_buf.shape[0] != h or rgb_buf.shape[1] != w:
+            rgb_buf = np.empty((h, w, 3), dtype=np.uint8)
+        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+
+        # Downscale for MediaPipe - landmarks come back normalized (0-1), so
+        # coordinates still map onto the full-res frame for drawing/cropping
+        # Only pay for FaceMesh inference every Nth frame - EAR/chin-Y change
+        # slowly, so the cached landmarks stay valid for the skipped frames
+        if frame_idx % PROCESS_EVERY_N == 0 or last_results is None:
+            scale = FACE_MESH_INPUT_SIZE / max(h, w)
+            if scale < 1.0:
+                small_rgb = cv2.resize(rgb, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            else:
+                small_rgb = rgb
+            results = face_mesh.process(small_rgb)
+            last_results = results
+        else:
+            results = last_results
+        frame_idx += 1
 
         face_found = False
         face_forward = True
@@ -448,13 +790,18 @@ def generate_frames():
         if results.multi_face_landmarks:
             face_found = True
             face_landmarks = results.multi_face_landmarks[0]
-            landmark_coords = [(int(p.x * w), int(p.y * h)) for p in face_landmarks.landmark]
+            # One (468, 2) pixel-space array for the whole frame - every
+            # detection below gathers from this instead of a tuple list
+            lm = np.fromiter(
+                (c for p in face_landmarks.landmark for c in (p.x * w, p.y * h)),
+                dtype=np.float32, count=len(face_landmarks.landmark) * 2
+            ).reshape(-1, 2)
 
             # Face orientation check - IMPROVED sensitivity
-            nose_x = landmark_coords[1][0]
-            left_eye_x = landmark_coords[33][0]
-            right_eye_x = landmark_coords[263][0]
-            face_center_x = (left_eye_x + right_eye_x) // 2
+            nose_x = lm[1, 0]
+            left_eye_x = lm[33, 0]
+            right_eye_x = lm[263, 0]
+            face_center_x = (left_eye_x + right_eye_x) / 2
             deviation = abs(nose_x - face_center_x)
 
             # More sensitive detection - reduced from 40 to 25 pixels
@@ -462,14 +809,14 @@ def generate_frames():
                 face_forward = False
 
             if face_forward:
-                last_attentive_time = time.time()
-                not_present_alerted = False
+                state.last_attentive_time = time.time()
+                state.not_present_alerted = False
 
             # Gradual drowsiness detection - Improved logic
             try:
-                left_eye_pts = [landmark_coords[i] for i in LEFT_EYE[:6]]
-                right_eye_pts = [landmark_coords[i] for i in RIGHT_EYE[:6]]
-                
+                left_eye_pts = lm[LEFT_EYE_IDX]
+                right_eye_pts = lm[RIGHT_EYE_IDX]
+
                 left_ear = eye_aspect_ratio(left_eye_pts)
                 right_ear = eye_aspect_ratio(right_eye_pts)
                 avg_ear = (left_ear + right_ear) / 2.0
@@ -477,123 +824,118 @@ def generate_frames():
                 current_status['ear_value'] = round(avg_ear, 3)
 
                 # Track recent EAR values for smoother detection
-                global recent_ear_values, drowsiness_score
-                recent_ear_values.append(avg_ear)
-                if len(recent_ear_values) > 10:
-                    recent_ear_values.pop(0)
-                
+                state.recent_ear_values.append(avg_ear)  # maxlen=10 deque
+
                 # Calculate average EAR over recent frames
-                avg_recent_ear = sum(recent_ear_values) / len(recent_ear_values) if recent_ear_values else avg_ear
-                
-                # Improved drowsiness scoring with better reset logic
-                if avg_recent_ear < DROWSY_EAR_THRESHOLD:  # Eyes very droopy (EAR < 0.30)
-                    drowsiness_score += 3  # Increase score faster for clearly closed/droopy eyes
-                    drowsy_counter += 1
-                elif avg_recent_ear < 0.32:  # Eyes slightly droopy
-                    drowsiness_score += 1  # Gradual increase for borderline cases
-                    drowsy_counter += 1
-                elif avg_recent_ear > 0.35:  # Eyes clearly open
-                    drowsiness_score = max(0, drowsiness_score - 3)  # Aggressive reset when eyes are open
-                    drowsy_counter = 0
-                else:  # Normal range (0.32-0.35)
-                    drowsiness_score = max(0, drowsiness_score - 1)  # Slow decrease in normal range
-                    drowsy_counter = 0
+                avg_recent_ear = sum(state.recent_ear_values) / len(state.recent_ear_values) if state.recent_ear_values else avg_ear
+
+                # Improved drowsiness scoring with better reset logic (jitted cascade)
+                state.drowsiness_score, state.drowsy_counter = update_drowsiness_score(
+                    avg_recent_ear, state.drowsiness_score, state.drowsy_counter, DROWSY_EAR_THRESHOLD)
 
                 # Only trigger drowsiness with stricter conditions
-                if (drowsiness_score > 20 and avg_recent_ear < 0.32) or drowsy_counter >= DROWSY_CONSEC_FRAMES:
+                if (state.drowsiness_score > 20 and avg_recent_ear < 0.32) or state.drowsy_counter >= DROWSY_CONSEC_FRAMES:
                     status = 'drowsy'
-                    confidence = min(1.0, drowsiness_score / 25.0)  # Confidence based on score
+                    confidence = min(1.0, state.drowsiness_score / 25.0)  # Confidence based on score
                     cv2.rectangle(frame, (20, 120), (250, 160), (0, 0, 255), -1)
                     cv2.putText(frame, "DROWSINESS", (30, 150), cv2.FONT_HERSHEY_COMPLEX, 0.8, (255, 255, 255), 2)
                 else:
                     # Reset drowsiness when not detected to prevent accumulation
                     if avg_recent_ear > 0.33:
-                        drowsiness_score = max(0, drowsiness_score - 2)
+                        state.drowsiness_score = max(0, state.drowsiness_score - 2)
                     
             except Exception as e:
                 print(f"Drowsiness detection error: {e}")
 
             # Nodding detection - UNCHANGED logic
             try:
-                if detect_nodding(landmark_coords):
+                if detect_nodding(state, lm):
                     status = 'drowsy'  # Nodding is considered drowsiness
                     confidence = 1.0
                     cv2.rectangle(frame, (20, 160), (200, 200), (0, 165, 255), -1)
                     cv2.putText(frame, "NODDING", (30, 190), cv2.FONT_HERSHEY_COMPLEX, 0.8, (255, 255, 255), 2)
-                    nodding_counter = 0
+                    state.nodding_counter = 0
             except Exception as e:
                 print(f"Nodding detection error: {e}")
 
             # Yawning detection - UNCHANGED logic
             try:
-                mouth_indices = [13, 14, 15, 16, 17, 78, 79, 80, 81, 82]
-                mouth_points = [landmark_coords[i] for i in mouth_indices]
+                mouth_points = lm[MOUTH_IDX].astype(np.int32)
 
-                x_min = max(min([p[0] for p in mouth_points]) - 10, 0)
-                x_max = min(max([p[0] for p in mouth_points]) + 10, w)
-                y_min = max(min([p[1] for p in mouth_points]) - 10, 0)
-                y_max = min(max([p[1] for p in mouth_points]) + 10, h)
+                # One fused min/max pass over both axes instead of four reductions
+                mins = mouth_points.min(axis=0) - 10
+                maxs = mouth_points.max(axis=0) + 10
+                x_min = max(int(mins[0]), 0)
+                x_max = min(int(maxs[0]), w)
+                y_min = max(int(mins[1]), 0)
+                y_max = min(int(maxs[1]), h)
 
                 mouth_img = frame[y_min:y_max, x_min:x_max]
                 cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 1)
 
                 if mouth_img.size != 0:
-                    mar = mouth_aspect_ratio(landmark_coords)
-                    mar = smoothed_mar(mar)
+                    mar = mouth_aspect_ratio(lm)
+                    mar = smoothed_mar(state, mar)
 
                     if mar > 0.4:
                         if yawn_model is not None:
                             try:
-                                mouth_img_processed = cv2.cvtColor(mouth_img, cv2.COLOR_BGR2RGB)
-                                mouth_img_processed = cv2.resize(mouth_img_processed, (24, 24)) / 255.0
-                                mouth_img_processed = np.expand_dims(mouth_img_processed, axis=0)
-                                yawn_prob = float(yawn_model.predict(mouth_img_processed, verbose=0)[0][0])
-                                        
+                                # Resize + normalize into the preallocated buffers (no new arrays)
+                                cv2.resize(cv2.cvtColor(mouth_img, cv2.COLOR_BGR2RGB),
+                                           (YAWN_INPUT_W, YAWN_INPUT_H), dst=_yawn_rgb_tmp)
+                                np.multiply(_yawn_rgb_tmp, 1.0 / 255.0, out=_yawn_input[0])
+                                mouth_img_processed = _yawn_input
+                                if yawn_tflite is not None:
+                                    yawn_tflite.set_tensor(yawn_tflite_input, mouth_img_processed)
+                                    yawn_tflite.invoke()
+                                    yawn_prob = float(yawn_tflite.get_tensor(yawn_tflite_output)[0][0])
+                                elif yawn_infer is not None:
+                                    yawn_prob = float(yawn_infer(mouth_img_processed)[0, 0])
+                                else:
+                                    yawn_prob = float(yawn_model.predict(mouth_img_processed, verbose=0)[0][0])
+
                             except Exception as e:
                                 print(f"Model prediction error: {e}")
                                 yawn_prob = min(1.0, max(0.0, (mar - 0.5) * 2.0))
                         else:
                             yawn_prob = min(1.0, max(0.0, (mar - 0.5) * 2.0))
 
-                        yawn_probs.append(yawn_prob)
-                        if len(yawn_probs) > 10:
-                            yawn_probs.pop(0)
+                        state.yawn_probs.append(yawn_prob)  # maxlen=10 deque
 
-                        avg_prob = sum(yawn_probs) / len(yawn_probs)
+                        avg_prob = sum(state.yawn_probs) / len(state.yawn_probs)
                         current_status['yawn_prob'] = round(avg_prob, 3)
 
                         if avg_prob > YAWN_THRESHOLD:
-                            yawn_counter += 1
+                            state.yawn_counter += 1
                         else:
-                            yawn_counter = 0
+                            state.yawn_counter = 0
 
-                        if yawn_counter >= YAWN_CONSEC_FRAMES:
+                        if state.yawn_counter >= YAWN_CONSEC_FRAMES:
                             status = 'yawning'
                             confidence = avg_prob
                             cv2.rectangle(frame, (20, 50), (200, 90), (0, 255, 255), -1)
                             cv2.putText(frame, "YAWNING", (30, 80), cv2.FONT_HERSHEY_COMPLEX, 0.8, (0, 0, 0), 2)
-                            yawn_counter = 0
+                            state.yawn_counter = 0
                     else:
-                        yawn_counter = 0
+                        state.yawn_counter = 0
                 else:
-                    yawn_counter = 0
+                    state.yawn_counter = 0
             except Exception as e:
                 print(f"Yawn detection error: {e}")
 
         # Absence detection - UNCHANGED logic
         if not face_found or not face_forward:
-            if time.time() - last_attentive_time > NOT_ATTENTIVE_THRESHOLD:
+            if time.time() - state.last_attentive_time > NOT_ATTENTIVE_THRESHOLD:
                 status = 'not_present'
                 confidence = 1.0
                 cv2.rectangle(frame, (20, 85), (250, 125), (255, 0, 0), -1)
                 cv2.putText(frame, "NOT PRESENT", (30, 115), cv2.FONT_HERSHEY_COMPLEX, 0.8, (255, 255, 255), 2)
-                
+
                 # Distraction Alert System
-                global last_distraction_alert, distraction_alert_count
                 current_time = time.time()
-                if current_time - last_distraction_alert >= DISTRACTION_ALERT_INTERVAL:
-                    distraction_alert_count += 1
-                    last_distraction_alert = current_time
+                if current_time - state.last_distraction_alert >= DISTRACTION_ALERT_INTERVAL:
+                    state.distraction_alert_count += 1
+                    state.last_distraction_alert = current_time
 
         # Update global status with additional debug info
         update_session_stats(status)  # Track statistics
@@ -603,21 +945,24 @@ def generate_frames():
             'confidence': confidence,
             'face_found': face_found,
             'face_forward': face_forward,
-            'time_since_attentive': round(time.time() - last_attentive_time, 1),
-            'drowsiness_score': drowsiness_score,  # Debug info
+            'time_since_attentive': round(time.time() - state.last_attentive_time, 1),
+            'drowsiness_score': state.drowsiness_score,  # Debug info
             'avg_recent_ear': round(avg_recent_ear if 'avg_recent_ear' in locals() else 0, 3),  # Debug info
-            'distraction_alert_count': distraction_alert_count,  # Alert count
-            'should_show_alert': status == 'not_present' and time.time() - last_distraction_alert < 3,  # Show alert for 3 seconds
+            'distraction_alert_count': state.distraction_alert_count,  # Alert count
+            'should_show_alert': status == 'not_present' and time.time() - state.last_distraction_alert < 3,  # Show alert for 3 seconds
             'timestamp': time.time()
         })
 
         # Encode frame
-        ret, buffer = cv2.imencode('.jpg', frame)
-        frame = buffer.tobytes()
+        if turbo_jpeg is not None:
+            frame = turbo_jpeg.encode(frame, quality=STREAM_JPEG_QUALITY)
+        else:
+            ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, STREAM_JPEG_QUALITY])
+            frame = buffer.tobytes()
         yield (b'--frame\r\n'
                b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
 
-    cap.release()
+    # Camera stays open in the grabber for the next viewer
 
 def allowed_file(filename):
     return '.' in filename and \
@@ -676,6 +1021,8 @@ def start_session():
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
                 file.save(file_path)
                 uploaded_files.append(filename)
+                # Pre-warm text extraction so chat answers don't wait on a parse
+                document_parse_pool.submit(warm_document_cache, filename)
     
     # Store session information
     session['username'] = username
@@ -683,8 +1030,10 @@ def start_session():
     session['session_duration'] = session_duration
     session['parent_email'] = parent_email if parent_email else None
     session['uploaded_files'] = uploaded_files
-    session['session_start_time'] = datetime.now().isoformat()
-    
+    session['session_start_time'] = datetime.now().isoformat()  # for display only
+    # Monotonic clock for duration math - immune to NTP jumps and needs no parsing
+    session['session_start_monotonic'] = time.monotonic()
+
     flash(f'Welcome {username}! Session started successfully.')
     return redirect(url_for('monitor'))
 
@@ -701,6 +1050,37 @@ def monitor():
                          uploaded_files=session.get('uploaded_files', []),
                          session_start_time=session.get('session_start_time'))
 
+def format_time(seconds):
+    """Render a seconds count as 'Xm Ys' for the analytics views"""
+    mins = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{mins}m {secs}s"
+
+def _compute_analytics(stats, actual_duration):
+    """Derive the focus metrics shared by /analytics and the PDF download.
+
+    Computed once at session end and stashed in session['computed_analytics']
+    so both endpoints read the same numbers instead of re-deriving them.
+    """
+    total_time = stats.get('focused_time', 0) + stats.get('distracted_time', 0) + \
+                 stats.get('drowsy_time', 0)
+
+    # Prevent division by zero
+    if total_time == 0:
+        total_time = 1
+
+    return {
+        'total_time': total_time,
+        'focus_percentage': (stats.get('focused_time', 0) / total_time) * 100,
+        'distraction_percentage': (stats.get('distracted_time', 0) / total_time) * 100,
+        'drowsy_percentage': (stats.get('drowsy_time', 0) / total_time) * 100,
+        'duration_minutes': actual_duration,
+    }
+
+# Upper bound for a believable monotonic duration - well above the 300-minute
+# cap start_session enforces, so only reboot-corrupted deltas are rejected
+MAX_PLAUSIBLE_SESSION_MINUTES = 24 * 60
+
 @app.route('/end_session')
 def end_session():
     global session_stats
@@ -726,89 +1106,72 @@ def end_session():
     # Store stats in session before clearing
     session['final_stats'] = session_stats.copy()
     
-    # Calculate session duration
-    if 'session_start_time' in session:
+    # Calculate session duration from the monotonic clock - no ISO parsing and
+    # immune to wall-clock jumps. The monotonic epoch is per-boot, though, and
+    # the start value lives in the session cookie, so a session spanning a
+    # host reboot/redeploy yields a garbage delta; sanity-check it and fall
+    # back to the wall-clock timestamp when it's negative or implausibly long
+    # (start_session caps sessions at 300 minutes).
+    duration_minutes = None
+    if 'session_start_monotonic' in session:
+        duration_minutes = (time.monotonic() - session['session_start_monotonic']) / 60
+        if duration_minutes < 0 or duration_minutes > MAX_PLAUSIBLE_SESSION_MINUTES:
+            duration_minutes = None
+    if duration_minutes is None and 'session_start_time' in session:
         start_time = datetime.fromisoformat(session['session_start_time'])
         end_time = datetime.now()
-        session['actual_duration'] = (end_time - start_time).total_seconds() / 60  # in minutes
-    
+        duration_minutes = (end_time - start_time).total_seconds() / 60  # in minutes
+    if duration_minutes is not None:
+        session['actual_duration'] = duration_minutes
+
+    # Derive the shared focus metrics once; /analytics and the PDF reuse them
+    session['computed_analytics'] = _compute_analytics(
+        session['final_stats'], session.get('actual_duration', 0))
+
     return redirect(url_for('analytics'))
 
+# Email dispatch happens off the request thread - the Resend round-trip is
+# hundreds of ms and the analytics page shouldn't wait on it
+email_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='email')
+
+# Resend's free tier caps at ~2 requests/s; smooth out bursts (several
+# students ending sessions at once) so we never eat 429s and retries.
+# Senders run on email_pool threads, so a lock + next-slot timestamp is
+# all the token bucket we need.
+EMAIL_SEND_RATE = float(os.getenv('RESEND_EMAILS_PER_SECOND', '2'))
+_email_rate_lock = Lock()
+_next_email_slot = 0.0
+
+def _throttle_email_send():
+    """Block the calling email worker until its send slot comes up."""
+    global _next_email_slot
+    if EMAIL_SEND_RATE <= 0:
+        return
+    min_interval = 1.0 / EMAIL_SEND_RATE
+    with _email_rate_lock:
+        now = time.monotonic()
+        slot = max(now, _next_email_slot)
+        _next_email_slot = slot + min_interval
+    if slot > now:
+        time.sleep(slot - now)
+
 def send_parent_notification(student_name, parent_email, analytics_data):
     """Send email notification to parent with session analytics"""
     if not RESEND_API_KEY or not parent_email:
         return False
     
     try:
-        # Create email HTML content
-        email_html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; background-color: #f4f4f4; padding: 20px; }}
-                .container {{ max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ background: linear-gradient(135deg, #8b5cf6, #3b82f6); color: white; padding: 20px; border-radius: 8px; text-align: center; }}
-                .metric {{ background: #f8f9fa; padding: 15px; margin: 10px 0; border-radius: 8px; border-left: 4px solid #8b5cf6; }}
-                .metric-label {{ font-size: 14px; color: #666; text-transform: uppercase; }}
-                .metric-value {{ font-size: 24px; font-weight: bold; color: #333; margin-top: 5px; }}
-                .score-excellent {{ color: #10b981; }}
-                .score-good {{ color: #3b82f6; }}
-                .score-moderate {{ color: #f59e0b; }}
-                .score-poor {{ color: #ef4444; }}
-                .footer {{ text-align: center; margin-top: 20px; padding-top: 20px; border-top: 1px solid #eee; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>📊 Study Session Report</h1>
-                    <p>Student: {student_name}</p>
-                    <p>{analytics_data['session_purpose']}</p>
-                </div>
-                
-                <h2 style="margin-top: 30px;">Session Overview</h2>
-                
-                <div class="metric">
-                    <div class="metric-label">Overall Focus Score</div>
-                    <div class="metric-value {'score-excellent' if analytics_data['focus_percentage'] >= 80 else 'score-good' if analytics_data['focus_percentage'] >= 60 else 'score-moderate' if analytics_data['focus_percentage'] >= 40 else 'score-poor'}">
-                        {analytics_data['focus_percentage']}%
-                    </div>
-                </div>
-                
-                <div class="metric">
-                    <div class="metric-label">Session Duration</div>
-                    <div class="metric-value">{analytics_data['duration_minutes']} minutes</div>
-                </div>
-                
-                <div class="metric">
-                    <div class="metric-label">Focused Time</div>
-                    <div class="metric-value">{analytics_data['focused_time']} ({analytics_data['focus_percentage']}%)</div>
-                </div>
-                
-                <div class="metric">
-                    <div class="metric-label">Distractions</div>
-                    <div class="metric-value">{analytics_data['distraction_count']} episodes</div>
-                </div>
-                
-                <div class="metric">
-                    <div class="metric-label">Drowsy Episodes</div>
-                    <div class="metric-value">{analytics_data['drowsy_count']}</div>
-                </div>
-                
-                <div class="metric">
-                    <div class="metric-label">Yawns Detected</div>
-                    <div class="metric-value">{analytics_data['yawn_count']}</div>
-                </div>
-                
-                <div class="footer">
-                    <p><strong>Study Monitoring System</strong></p>
-                    <p>This is an automated report sent after {student_name}'s study session.</p>
-                    <p>Session Date: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
+        # Render the email from a precompiled Jinja2 template (templates/parent_email.html).
+        # Jinja2 compiles templates to bytecode once and caches them, so repeat sends
+        # skip re-parsing the big HTML blob. app_context() is needed because this
+        # runs on the email_pool thread, outside any request.
+        with app.app_context():
+            email_html = render_template(
+                'parent_email.html',
+                student_name=student_name,
+                session_date=datetime.now().strftime('%B %d, %Y at %I:%M %p'),
+                **analytics_data
+            )
         
         # Send email via Resend
         # Note: For production, replace with your verified domain email
@@ -822,7 +1185,8 @@ def send_parent_notification(student_name, parent_email, analytics_data):
         
         print(f"📧 Attempting to send email to {parent_email}...")
         print(f"   Using Resend API Key: {RESEND_API_KEY[:10]}...")
-        
+
+        _throttle_email_send()  # respect Resend's rate cap under bursty load
         email = resend.Emails.send(params)
         print(f"✅ Email sent successfully!")
         print(f"   Email ID: {email.get('id')}")
@@ -849,26 +1213,14 @@ def analytics():
     username = session.get('username', 'User')
     session_purpose = session.get('session_purpose', 'Study Session')
     actual_duration = session.get('actual_duration', 0)
-    
-    # Calculate total time
-    total_time = stats.get('focused_time', 0) + stats.get('distracted_time', 0) + \
-                 stats.get('drowsy_time', 0)
-    
-    # Prevent division by zero
-    if total_time == 0:
-        total_time = 1
-    
-    # Calculate percentages
-    focus_percentage = (stats.get('focused_time', 0) / total_time) * 100
-    distraction_percentage = (stats.get('distracted_time', 0) / total_time) * 100
-    drowsy_percentage = (stats.get('drowsy_time', 0) / total_time) * 100
-    
-    # Format times to minutes and seconds
-    def format_time(seconds):
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{mins}m {secs}s"
-    
+
+    # Metrics were computed once at session end; fall back for old sessions
+    computed = session.get('computed_analytics') or _compute_analytics(stats, actual_duration)
+    total_time = computed['total_time']
+    focus_percentage = computed['focus_percentage']
+    distraction_percentage = computed['distraction_percentage']
+    drowsy_percentage = computed['drowsy_percentage']
+
     analytics_data = {
         'username': username,
         'session_purpose': session_purpose,
@@ -886,14 +1238,14 @@ def analytics():
         'react_dashboard_url': os.getenv('REACT_DASHBOARD_URL', 'http://localhost:3000/dashboard')
     }
     
-    # Send email notification to parent if email was provided
+    # Queue the parent email in the background - page renders immediately.
+    # One flash only: each flash() re-serializes and re-signs the session
+    # cookie, and delivery success/failure is logged server-side by
+    # send_parent_notification rather than flashed after the fact.
     parent_email = session.get('parent_email')
     if parent_email:
-        email_sent = send_parent_notification(username, parent_email, analytics_data)
-        if email_sent:
-            flash(f'✅ Report sent to parent at {parent_email}')
-        else:
-            flash(f'⚠️ Could not send report to {parent_email}')
+        email_pool.submit(send_parent_notification, username, parent_email, analytics_data)
+        flash(f'📧 Report scheduled for {parent_email}')
     
     return render_template('analytics.html', **analytics_data)
 
@@ -901,62 +1253,118 @@ def analytics():
 def finish_analytics():
     """Clear session and redirect to React dashboard"""
     session.clear()
-    
+
     # Get the React URL from environment or use default
     react_url = os.getenv('REACT_DASHBOARD_URL', 'http://localhost:3004')
-    
-    # Return HTML that sets localStorage and redirects
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>Redirecting...</title>
-        <style>
-            body {{
-                margin: 0;
-                padding: 0;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-                min-height: 100vh;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, sans-serif;
-                color: white;
-            }}
-            .container {{
-                text-align: center;
-            }}
-            .spinner {{
-                width: 50px;
-                height: 50px;
-                border: 4px solid rgba(255,255,255,0.3);
-                border-top-color: white;
-                border-radius: 50%;
-                animation: spin 1s linear infinite;
-                margin: 0 auto 20px;
-            }}
-            @keyframes spin {{
-                to {{ transform: rotate(360deg); }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="spinner"></div>
-            <h2>Session Complete! 🎉</h2>
-            <p>Redirecting to Learning Dashboard...</p>
-        </div>
-        <script>
-            // Set flag in localStorage to indicate session completion
-            localStorage.setItem('sessionCompleted', 'true');
-            // Redirect to React dashboard
-            setTimeout(function() {{
-                window.location.href = '{react_url}/#dashboard';
-            }}, 1000);
-        </script>
-    </body>
-    </html>
-    '''
+
+    # The completion page is a cacheable static asset now; the dashboard URL
+    # travels in the query string instead of being interpolated into HTML
+    # on every call
+    return redirect(
+        url_for('static', filename='finish_redirect.html',
+                next=f'{react_url}/#dashboard')
+    )
+
+# ReportLab styles for the analytics PDF are pure constants - build them once
+# at import time so each download skips the style allocations and repeated
+# HexColor string parsing (HexColor re-parses the hex string every __init__)
+_PDF_PURPLE = colors.HexColor('#8b5cf6')
+_PDF_BLUE = colors.HexColor('#3b82f6')
+_PDF_GREEN = colors.HexColor('#10b981')
+_PDF_INDIGO = colors.HexColor('#6366f1')
+
+_PDF_STYLESHEET = getSampleStyleSheet()
+
+_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_PDF_STYLESHEET['Heading1'],
+    fontSize=24,
+    textColor=_PDF_PURPLE,
+    spaceAfter=30,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_PDF_STYLESHEET['Heading2'],
+    fontSize=16,
+    textColor=_PDF_BLUE,
+    spaceAfter=12,
+    spaceBefore=12,
+    fontName='Helvetica-Bold'
+)
+
+_NORMAL_STYLE = ParagraphStyle(
+    'CustomNormal',
+    parent=_PDF_STYLESHEET['Normal'],
+    fontSize=11,
+    spaceAfter=8
+)
+
+_FOOTER_STYLE = ParagraphStyle(
+    'Footer',
+    parent=_PDF_STYLESHEET['Normal'],
+    fontSize=9,
+    textColor=colors.grey,
+    alignment=TA_CENTER
+)
+
+_SESSION_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _PDF_PURPLE),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f3f4f6')),
+    ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
+    ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 8),
+])
+
+_FOCUS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#dbeafe')),
+    ('GRID', (0, 0), (-1, -1), 1, _PDF_BLUE),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 11),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+])
+
+_STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _PDF_GREEN),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, _PDF_GREEN),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0fdf4')]),
+])
+
+_TIME_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), _PDF_INDIGO),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, _PDF_INDIGO),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('PADDING', (0, 0), (-1, -1), 10),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#eef2ff')]),
+    ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e0e7ff')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+])
 
 @app.route('/download_analytics_pdf')
 def download_analytics_pdf():
@@ -971,59 +1379,24 @@ def download_analytics_pdf():
     session_purpose = session.get('session_purpose', 'Study Session')
     actual_duration = session.get('actual_duration', 0)
     session_start = session.get('session_start_time', datetime.now().isoformat())
-    
-    # Calculate statistics
-    total_time = stats.get('focused_time', 0) + stats.get('distracted_time', 0) + stats.get('drowsy_time', 0)
-    if total_time == 0:
-        total_time = 1
-    
-    focus_percentage = (stats.get('focused_time', 0) / total_time) * 100
-    distraction_percentage = (stats.get('distracted_time', 0) / total_time) * 100
-    drowsy_percentage = (stats.get('drowsy_time', 0) / total_time) * 100
-    
-    def format_time(seconds):
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{mins}m {secs}s"
-    
-    # Create PDF in memory
-    buffer = BytesIO()
+
+    # Same metrics the analytics page showed - computed once at session end
+    computed = session.get('computed_analytics') or _compute_analytics(stats, actual_duration)
+    total_time = computed['total_time']
+    focus_percentage = computed['focus_percentage']
+    distraction_percentage = computed['distraction_percentage']
+    drowsy_percentage = computed['drowsy_percentage']
+
+    # Build the PDF into a spooled temp file: small reports stay in RAM,
+    # big ones spill to disk instead of ballooning the worker's heap
+    buffer = SpooledTemporaryFile(max_size=1 << 20)
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
     
     # Container for PDF elements
     elements = []
-    
-    # Styles
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#8b5cf6'),
-        spaceAfter=30,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=16,
-        textColor=colors.HexColor('#3b82f6'),
-        spaceAfter=12,
-        spaceBefore=12,
-        fontName='Helvetica-Bold'
-    )
-    
-    normal_style = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=11,
-        spaceAfter=8
-    )
-    
-    # Title
-    elements.append(Paragraph("📊 Session Analytics Report", title_style))
+
+    # Title (styles are module-level constants - see _TITLE_STYLE et al above)
+    elements.append(Paragraph("📊 Session Analytics Report", _TITLE_STYLE))
     elements.append(Spacer(1, 0.2*inch))
     
     # Session Information Table
@@ -1036,26 +1409,13 @@ def download_analytics_pdf():
     ]
     
     session_table = Table(session_data, colWidths=[2.5*inch, 4*inch])
-    session_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8b5cf6')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#f3f4f6')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#d1d5db')),
-        ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('PADDING', (0, 0), (-1, -1), 8),
-    ]))
+    session_table.setStyle(_SESSION_TABLE_STYLE)
     
     elements.append(session_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Focus Score Section
-    elements.append(Paragraph("Overall Focus Score", heading_style))
+    elements.append(Paragraph("Overall Focus Score", _HEADING_STYLE))
     
     focus_data = [
         ['Focus Percentage', f"{focus_percentage:.1f}%"],
@@ -1067,20 +1427,13 @@ def download_analytics_pdf():
     ]
     
     focus_table = Table(focus_data, colWidths=[2.5*inch, 4*inch])
-    focus_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, -1), colors.HexColor('#dbeafe')),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#3b82f6')),
-        ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 11),
-        ('PADDING', (0, 0), (-1, -1), 10),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-    ]))
+    focus_table.setStyle(_FOCUS_TABLE_STYLE)
     
     elements.append(focus_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Statistics Summary
-    elements.append(Paragraph("📈 Detailed Statistics", heading_style))
+    elements.append(Paragraph("📈 Detailed Statistics", _HEADING_STYLE))
     
     stats_data = [
         ['Metric', 'Count/Time', 'Percentage'],
@@ -1091,26 +1444,13 @@ def download_analytics_pdf():
     ]
     
     stats_table = Table(stats_data, colWidths=[2.2*inch, 2.2*inch, 2.1*inch])
-    stats_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#10b981')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#10b981')),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('PADDING', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f0fdf4')]),
-    ]))
+    stats_table.setStyle(_STATS_TABLE_STYLE)
     
     elements.append(stats_table)
     elements.append(Spacer(1, 0.3*inch))
     
     # Time Distribution
-    elements.append(Paragraph("⏱️ Time Distribution", heading_style))
+    elements.append(Paragraph("⏱️ Time Distribution", _HEADING_STYLE))
     
     time_data = [
         ['Activity', 'Duration', 'Percentage'],
@@ -1121,28 +1461,13 @@ def download_analytics_pdf():
     ]
     
     time_table = Table(time_data, colWidths=[2.2*inch, 2.2*inch, 2.1*inch])
-    time_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#6366f1')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('TOPPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#6366f1')),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-        ('PADDING', (0, 0), (-1, -1), 10),
-        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#eef2ff')]),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.HexColor('#e0e7ff')),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-    ]))
+    time_table.setStyle(_TIME_TABLE_STYLE)
     
     elements.append(time_table)
     elements.append(Spacer(1, 0.4*inch))
     
     # Recommendations
-    elements.append(Paragraph("💡 Recommendations", heading_style))
+    elements.append(Paragraph("💡 Recommendations", _HEADING_STYLE))
     
     recommendations = []
     if focus_percentage < 60:
@@ -1163,38 +1488,30 @@ def download_analytics_pdf():
         recommendations.append("• Continue monitoring your attention patterns")
     
     for rec in recommendations:
-        elements.append(Paragraph(rec, normal_style))
-    
+        elements.append(Paragraph(rec, _NORMAL_STYLE))
+
     elements.append(Spacer(1, 0.3*inch))
-    
+
     # Footer
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.grey,
-        alignment=TA_CENTER
-    )
     elements.append(Spacer(1, 0.2*inch))
-    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", footer_style))
-    elements.append(Paragraph("Attention Monitoring System - Focus on Excellence", footer_style))
+    elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}", _FOOTER_STYLE))
+    elements.append(Paragraph("Attention Monitoring System - Focus on Excellence", _FOOTER_STYLE))
     
     # Build PDF
     doc.build(elements)
-    
-    # Get PDF data
-    pdf_data = buffer.getvalue()
-    buffer.close()
-    
-    # Create response
-    response = app.response_class(
-        pdf_data,
+
+    # Stream the spooled file straight out instead of copying it into a
+    # bytes object with getvalue() - halves peak memory per download
+    buffer.seek(0)
+    response = Response(
+        FileWrapper(buffer),
         mimetype='application/pdf',
+        direct_passthrough=True,
         headers={
             'Content-Disposition': f'attachment; filename=Session_Analytics_{username}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
         }
     )
-    
+
     return response
 
 @app.route('/uploads/<filename>')
@@ -1208,7 +1525,10 @@ def uploaded_file(filename):
 @app.route('/music/<filename>')
 def serve_music(filename):
     """Serve music files from the server directory"""
-    return send_from_directory('server', filename)
+    response = send_from_directory('server', filename)
+    # Music tracks never change once shipped - let the browser keep them forever
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
 
 @app.route('/view_files')
 def view_files():
@@ -1227,16 +1547,8 @@ def video_feed():
 
 @app.route('/status')
 def get_status():
-    # Convert NumPy types to native Python types for JSON serialization
-    safe_status = {}
-    for key, value in current_status.items():
-        if hasattr(value, 'item'):  # NumPy scalar
-            safe_status[key] = value.item()
-        elif isinstance(value, (np.floating, np.integer)):
-            safe_status[key] = value.item()
-        else:
-            safe_status[key] = value
-    return jsonify(safe_status)
+    # NumpyJSONProvider handles any stray NumPy scalars - no per-key rebuild
+    return jsonify(current_status)
 
 @app.route('/chat', methods=['POST'])
 def chat():
@@ -1348,38 +1660,17 @@ Instructions:
             'error': 'Internal server error'
         }), 500
 
-@app.route('/api/generate_quiz', methods=['POST'])
-def generate_quiz_secure():
-    """
-    Secure quiz generation endpoint - API key never leaves the server
-    Accepts: document text, difficulty, question count
-    Returns: Generated quiz JSON
-    """
-    try:
-        data = request.get_json()
-        document_text = data.get('documentText', '').strip()
-        difficulty = data.get('difficulty', 'undergraduate')
-        question_count = data.get('questionCount', 10)
-        
-        if not document_text:
-            return jsonify({
-                'success': False,
-                'error': 'Document text is required'
-            }), 400
-        
-        if not GEMINI_API_KEY:
-            return jsonify({
-                'success': False,
-                'error': 'Gemini API key not configured on server'
-            }), 500
-        
-        # Build the quiz generation prompt
-        prompt = f"""You are an expert quiz generator. Generate {question_count} multiple-choice questions from this document.
+# Compiled once - Gemini wraps its quiz JSON in a ```json fence more often than not
+_JSON_BLOCK_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+
+# Static prompt scaffolding built once; only the three placeholders change
+# per request (JSON braces are doubled for str.format)
+_QUIZ_PROMPT_TMPL = """You are an expert quiz generator. Generate {question_count} multiple-choice questions from this document.
 
 Difficulty Level: {difficulty}
 
 Document Content:
-{document_text[:4000]}
+{document}
 
 Generate questions in this EXACT JSON format:
 {{
@@ -1406,16 +1697,45 @@ Requirements:
 
 Respond ONLY with valid JSON, no other text."""
 
+@app.route('/api/generate_quiz', methods=['POST'])
+def generate_quiz_secure():
+    """
+    Secure quiz generation endpoint - API key never leaves the server
+    Accepts: document text, difficulty, question count
+    Returns: Generated quiz JSON
+    """
+    try:
+        data = request.get_json()
+        document_text = data.get('documentText', '').strip()
+        difficulty = data.get('difficulty', 'undergraduate')
+        question_count = data.get('questionCount', 10)
+        
+        if not document_text:
+            return jsonify({
+                'success': False,
+                'error': 'Document text is required'
+            }), 400
+        
+        if not GEMINI_API_KEY:
+            return jsonify({
+                'success': False,
+                'error': 'Gemini API key not configured on server'
+            }), 500
+        
+        # Fill the precompiled prompt template (static scaffolding lives in
+        # _QUIZ_PROMPT_TMPL at module scope)
+        prompt = _QUIZ_PROMPT_TMPL.format(
+            question_count=question_count,
+            difficulty=difficulty,
+            document=document_text[:4000]
+        )
+
         # Call Gemini API (server-side, API key hidden)
         response = gemini_model.generate_content(prompt)
         ai_response = response.text
         
-        # Parse JSON from response
-        import json
-        import re
-        
         # Extract JSON from response (handle markdown code blocks)
-        json_match = re.search(r'```json\s*(\{.*?\})\s*```', ai_response, re.DOTALL)
+        json_match = _JSON_BLOCK_RE.search(ai_response)
         if json_match:
             quiz_data = json.loads(json_match.group(1))
         else:
@@ -1426,7 +1746,6 @@ Respond ONLY with valid JSON, no other text."""
             'success': True,
             'quiz': quiz_data,
             'metadata': {
-                'generationTime': 0,
                 'difficulty': difficulty,
                 'questionCount': len(quiz_data.get('questions', []))
             }
@@ -1470,7 +1789,16 @@ def get_video_recommendations():
                 'success': False,
                 'error': 'Please provide a topic'
             }), 400
-        
+
+        # Serve repeat topics from the TTL cache - a dict lookup instead of an API hit
+        cache_key = topic.strip().lower()
+        with _yt_cache_lock:
+            cached = yt_search_cache.get(cache_key)
+        if cached is not None:
+            response = jsonify(cached)
+            response.headers['Cache-Control'] = 'public, max-age=3600'
+            return response
+
         # YouTube Data API v3 - Search endpoint
         youtube_api_url = "https://www.googleapis.com/youtube/v3/search"
         
@@ -1487,7 +1815,7 @@ def get_video_recommendations():
         }
         
         print(f"🔍 Searching YouTube for: {topic}")
-        response = requests.get(youtube_api_url, params=params, timeout=10)
+        response = yt_client.get(youtube_api_url, params=params)
         
         if response.status_code != 200:
             error_data = response.json()
@@ -1526,19 +1854,25 @@ def get_video_recommendations():
                 'error': 'No videos found for this topic. Try a different search term.'
             }), 404
         
-        return jsonify({
+        payload = {
             'success': True,
             'videos': videos,
             'topic': topic,
             'count': len(videos)
-        })
-        
-    except requests.exceptions.Timeout:
+        }
+        with _yt_cache_lock:
+            yt_search_cache[cache_key] = payload
+
+        response = jsonify(payload)
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        return response
+
+    except httpx.TimeoutException:
         return jsonify({
             'success': False,
             'error': 'Request timed out. Please try again.'
         }), 504
-    except requests.exceptions.RequestException as e:
+    except httpx.RequestError as e:
         print(f"Request error: {e}")
         return jsonify({
             'success': False,
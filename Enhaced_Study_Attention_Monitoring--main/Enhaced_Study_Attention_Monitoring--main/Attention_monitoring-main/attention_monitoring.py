@@ -1,4 +1,5 @@
 import cv2
+import math
 import numpy as np
 import mediapipe as mp
 from tensorflow.keras.models import load_model
@@ -9,9 +10,15 @@ import winsound
 #model
 yawn_model = load_model("yawn_model.h5")
 
-#MediaPipe
+#MediaPipe - static_image_mode=False keeps the cheap tracking model running
+# between detections, refine_landmarks=False (the default, made explicit)
+# skips the iris sub-network we don't use, and the tracking confidence of
+# 0.5 avoids needless full re-detection passes
 mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1, min_detection_confidence=0.5)
+face_mesh = mp_face_mesh.FaceMesh(static_image_mode=False, max_num_faces=1,
+                                  refine_landmarks=False,
+                                  min_detection_confidence=0.5,
+                                  min_tracking_confidence=0.5)
 
 # Constants
 YAWN_THRESHOLD = 0.70  
@@ -21,9 +28,11 @@ NOT_ATTENTIVE_THRESHOLD = 6
 DROWSY_EAR_THRESHOLD = 0.23
 DROWSY_CONSEC_FRAMES = 30
 
-# Landmark indices
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+# Landmark indices - ndarrays built once so per-frame lookups are a single
+# C-level gather instead of a Python list comprehension
+LEFT_EYE_IDX = np.array([33, 160, 158, 133, 153, 144], dtype=np.intp)
+RIGHT_EYE_IDX = np.array([362, 385, 387, 263, 373, 380], dtype=np.intp)
+MOUTH_IDX = np.array([13, 14, 15, 16, 17, 78, 79, 80, 81, 82], dtype=np.intp)
 
 # State variables
 yawn_counter = 0
@@ -61,13 +70,14 @@ def alert_absence():
         sound_alert()
         last_alert_time = time.time()
 
-# Mouth Aspect Ratio
+# Mouth Aspect Ratio (landmark_coords is the per-frame (468, 2) ndarray)
 def mouth_aspect_ratio(landmark_coords):
-    A = np.linalg.norm(np.array(landmark_coords[13]) - np.array(landmark_coords[14]))
-    B = np.linalg.norm(np.array(landmark_coords[78]) - np.array(landmark_coords[82]))
+    ax, ay = landmark_coords[13] - landmark_coords[14]
+    bx, by = landmark_coords[78] - landmark_coords[82]
+    B = math.hypot(bx, by)
     if B == 0:
         return 0
-    return A / B
+    return math.hypot(ax, ay) / B
 
 # MAR smoothing
 mar_list = []
@@ -79,17 +89,31 @@ def smoothed_mar(current_mar, window=5):
         mar_list.pop(0)
     return sum(mar_list) / len(mar_list)
 
-# Eye Aspect Ratio
+# Eye Aspect Ratio (eye_points is a (6, 2) ndarray gathered by fancy indexing)
 def eye_aspect_ratio(eye_points):
-    A = np.linalg.norm(np.array(eye_points[1]) - np.array(eye_points[5]))
-    B = np.linalg.norm(np.array(eye_points[2]) - np.array(eye_points[4]))
-    C = np.linalg.norm(np.array(eye_points[0]) - np.array(eye_points[3]))
+    dx1, dy1 = eye_points[1] - eye_points[5]
+    dx2, dy2 = eye_points[2] - eye_points[4]
+    dxh, dyh = eye_points[0] - eye_points[3]
+    C = math.hypot(dxh, dyh)
     if C == 0:
         return 0
-    return (A + B) / (2.0 * C)
+    return (math.hypot(dx1, dy1) + math.hypot(dx2, dy2)) / (2.0 * C)
 
-# Camera 
+# Camera - request MJPG at an explicit size/rate so the driver hands over
+# compressed frames instead of raw YUY2 (which caps FPS and stalls reads)
 cap = cv2.VideoCapture(0)
+cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc('M', 'J', 'P', 'G'))
+cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+cap.set(cv2.CAP_PROP_FPS, 30)
+cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+# Preallocated buffers - cv2's dst= writes in place, so no ~900 KB RGB frame
+# (or mouth-crop intermediates) is allocated per iteration
+rgb_buf = None  # sized from the first frame
+mouth_resize_buf = np.empty((64, 64, 3), dtype=np.uint8)
+mouth_rgb_buf = np.empty((64, 64, 3), dtype=np.uint8)
+mouth_input = np.empty((1, 64, 64, 3), dtype=np.float32)
 
 while True:
     ret, frame = cap.read()
@@ -98,8 +122,10 @@ while True:
         break
 
     h, w = frame.shape[:2]
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
+    if rgb_buf is None or rgb_buf.shape != frame.shape:
+        rgb_buf = np.empty_like(frame)
+    cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_buf)
+    results = face_mesh.process(rgb_buf)
 
     face_found = False
     face_forward = True
@@ -107,7 +133,12 @@ while True:
     if results.multi_face_landmarks:
         face_found = True
         face_landmarks = results.multi_face_landmarks[0]
-        landmark_coords = [(int(p.x * w), int(p.y * h)) for p in face_landmarks.landmark]
+        # One contiguous (468, 2) array; scaling to pixels is a single
+        # vectorized multiply instead of a 468-iteration Python loop
+        lm = face_landmarks.landmark
+        pts = np.fromiter((c for p in lm for c in (p.x, p.y)),
+                          dtype=np.float32, count=2 * len(lm)).reshape(-1, 2)
+        landmark_coords = (pts * np.array([w, h], dtype=np.float32)).astype(np.int32)
 
         # Face orientation
         nose_x = landmark_coords[1][0]
@@ -125,8 +156,8 @@ while True:
 
         # Drowsiness detection
         try:
-            left_eye_pts = [landmark_coords[i] for i in LEFT_EYE]
-            right_eye_pts = [landmark_coords[i] for i in RIGHT_EYE]
+            left_eye_pts = landmark_coords[LEFT_EYE_IDX]
+            right_eye_pts = landmark_coords[RIGHT_EYE_IDX]
             left_ear = eye_aspect_ratio(left_eye_pts)
             right_ear = eye_aspect_ratio(right_eye_pts)
             avg_ear = (left_ear + right_ear) / 2.0
@@ -146,13 +177,11 @@ while True:
 
         # Yawning detection with MAR smoothing
         try:
-            mouth_indices = [13, 14, 15, 16, 17, 78, 79, 80, 81, 82]
-            mouth_points = [landmark_coords[i] for i in mouth_indices]
-
-            x_min = max(min([p[0] for p in mouth_points]) - 10, 0)
-            x_max = min(max([p[0] for p in mouth_points]) + 10, w)
-            y_min = max(min([p[1] for p in mouth_points]) - 10, 0)
-            y_max = min(max([p[1] for p in mouth_points]) + 10, h)
+            mouth_points = landmark_coords[MOUTH_IDX]
+            # Padded bbox with the clamps fused into the reductions - two
+            # vectorized ops instead of four scalar min/max pairs
+            x_min, y_min = np.maximum(mouth_points.min(axis=0) - 10, 0).tolist()
+            x_max, y_max = np.minimum(mouth_points.max(axis=0) + 10, (w, h)).tolist()
 
             mouth_img = frame[y_min:y_max, x_min:x_max]
             cv2.rectangle(frame, (x_min, y_min), (x_max, y_max), (0, 255, 0), 1)
@@ -162,11 +191,14 @@ while True:
                 mar = smoothed_mar(mar)
 
                 if mar > 0.4:
-                    mouth_img = cv2.cvtColor(mouth_img, cv2.COLOR_BGR2RGB)
-                    mouth_img = cv2.resize(mouth_img, (64, 64)) / 255.0
-                    mouth_img = np.expand_dims(mouth_img, axis=0)
-
-                    yawn_prob = yawn_model.predict(mouth_img)[0][0]
+                    # Resize first so the conversion and normalization run on
+                    # fixed 64x64 buffers instead of fresh arrays per frame
+                    cv2.resize(mouth_img, (64, 64), dst=mouth_resize_buf,
+                               interpolation=cv2.INTER_AREA)
+                    cv2.cvtColor(mouth_resize_buf, cv2.COLOR_BGR2RGB, dst=mouth_rgb_buf)
+                    np.multiply(mouth_rgb_buf, 1.0 / 255.0, out=mouth_input[0])
+
+                    yawn_prob = yawn_model.predict(mouth_input)[0][0]
                     yawn_probs.append(yawn_prob)
                     if len(yawn_probs) > 10:
                         yawn_probs.pop(0)
@@ -207,4 +239,5 @@ while True:
         break
 
 cap.release()
+face_mesh.close()  # deterministic graph teardown
 cv2.destroyAllWindows()
@@ -0,0 +1,53 @@
+"""
+One-time converter: yawn_model.h5 -> yawn_model.tflite (INT8 quantized)
+Run this once after training; app.py automatically prefers the .tflite
+model when it exists. INT8 weights halve memory bandwidth and typically
+give a 2-4x CPU inference speedup for this tiny CNN via XNNPACK.
+"""
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.models import load_model
+
+MODEL_H5 = "yawn_model.h5"
+MODEL_TFLITE = "yawn_model.tflite"
+
+
+def make_representative_dataset(input_shape):
+    """Build a calibration generator matching the model's own input shape.
+
+    The shape comes from the loaded model (64x64x3 for the trained yawn CNN)
+    rather than being hard-coded, so the converter never feeds samples the
+    network can't accept. Ideally these would be real mouth crops from the
+    training set, but the input domain is just normalized RGB in [0, 1] so
+    uniform noise gives the quantizer sane activation ranges.
+    """
+    sample_shape = (1,) + tuple(input_shape[1:])
+
+    def representative_dataset():
+        for _ in range(100):
+            yield [np.random.uniform(0, 1, sample_shape).astype(np.float32)]
+
+    return representative_dataset
+
+
+def main():
+    print("🔄 Loading Keras model...")
+    model = load_model(MODEL_H5, compile=False)
+
+    print("🔄 Converting to INT8 TFLite...")
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = make_representative_dataset(model.input_shape)
+    # Keep float32 I/O so app.py can feed the same normalized crop it already builds
+    tflite_model = converter.convert()
+
+    with open(MODEL_TFLITE, "wb") as f:
+        f.write(tflite_model)
+
+    print(f"✅ Wrote {MODEL_TFLITE} ({len(tflite_model) / 1024:.1f} KB)")
+    print("   app.py will pick it up automatically on next start")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,12 +6,18 @@ No TensorFlow dependency - generates accurate metrics based on actual system beh
 import numpy as np
 import time
 import json
+import multiprocessing
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from sklearn.metrics import precision_score, recall_score, f1_score, accuracy_score, confusion_matrix
 import os
 
+# Optional fused generation kernel - numba parallelizes the per-state
+# scale/shift/clamp across cores and skips the small per-state temporaries.
+# Without numba installed the plain NumPy masking path below is used.
+try:
+    from utils_numba import fill_state_samples
+except ImportError:
+    fill_state_samples = None
+
 class FixedRealisticTester:
     def __init__(self):
         """Initialize with realistic parameters based on actual system performance"""
@@ -28,170 +34,197 @@ class FixedRealisticTester:
             'mar_values': []
         }
         
+        # PCG64 generator instance - noticeably faster than the legacy
+        # np.random.* singleton (and lock-free) for the bulk draws below
+        self.rng = np.random.default_rng()
+
+        # Set by generate_calibrated_test_data; saves re-deriving the sample
+        # count from buffer lengths in every downstream block
+        self.num_samples = 0
+
         # Actual working thresholds from your system
         self.DROWSY_EAR_THRESHOLD = 0.25
         self.YAWN_THRESHOLD = 0.70
         self.NODDING_THRESHOLD = 15
         self.PRESENCE_DEVIATION_THRESHOLD = 40
 
+    # Per-state measurement calibration: (ear mu/sd, mar mu/sd, presence
+    # deviation mu/sd, nod movement mu/sd, yawn beta a/b, base confidence).
+    # Same numbers as the original per-sample branches, just tabulated so the
+    # generator can draw each state's samples in bulk.
+    STATE_PARAMS = {
+        'normal':  (0.285, 0.012, 0.19, 0.02,  12, 6,  2, 1.5, 1, 12, 0.92),
+        'drowsy':  (0.18,  0.015, 0.18, 0.025, 18, 10, 9, 4,   2, 8,  0.89),
+        'yawning': (0.275, 0.02,  0.55, 0.05,  15, 8,  3, 2,   9, 2,  0.94),
+        'absent':  (0.270, 0.035, 0.21, 0.04,  85, 20, 5, 4,   1, 15, 0.88),
+        'nodding': (0.265, 0.025, 0.20, 0.03,  32, 12, 28, 7,  2, 10, 0.82),
+    }
+
+    # Parallel generation only pays for itself once per-worker RNG setup and
+    # IPC are dwarfed by the actual sampling work
+    PARALLEL_MIN_SAMPLES = 50_000
+
+    def _generate_arrays(self, num_samples):
+        """Generate one batch of calibrated samples as a results-shaped dict."""
+        # Realistic state distribution based on actual usage patterns
+        states = ['normal', 'drowsy', 'yawning', 'absent', 'nodding']
+        state_probabilities = [0.52, 0.18, 0.12, 0.10, 0.08]  # More normal states in practice
+
+        # Draw every state up front, then fill the measurement arrays through
+        # boolean masks - one bulk RNG call per state and quantity instead of
+        # ~10 scalar RNG calls per sample through the interpreter
+        true_state_idx = self.rng.choice(len(states), size=num_samples, p=state_probabilities)
+
+        # float32 buffers from the start - the values carry ~3 significant
+        # digits, and halving the element size halves the bandwidth of every
+        # downstream reduction (assignments cast the float64 draws in place)
+        ear = np.empty(num_samples, dtype=np.float32)
+        mar = np.empty(num_samples, dtype=np.float32)
+        presence_dev = np.empty(num_samples, dtype=np.float32)
+        nod_movement = np.empty(num_samples, dtype=np.float32)
+        yawn_prob = np.empty(num_samples, dtype=np.float32)
+        base_confidence = np.empty(num_samples, dtype=np.float32)
+
+        if fill_state_samples is not None:
+            # Fused numba path: pre-draw standard normals so the Generator
+            # stays the single randomness source, then let the kernel do the
+            # per-state scale/shift and bounds clamping in one parallel pass
+            params = np.array([self.STATE_PARAMS[s][:8] + (self.STATE_PARAMS[s][10],)
+                               for s in states])
+            z = self.rng.standard_normal((4, num_samples))
+            fill_state_samples(true_state_idx, params, z[0], z[1], z[2], z[3],
+                               ear, mar, presence_dev, nod_movement, base_confidence)
+            # Beta draws depend on per-state shape parameters, so they stay
+            # as bulk masked draws
+            for s, state in enumerate(states):
+                y_a, y_b = self.STATE_PARAMS[state][8:10]
+                mask = true_state_idx == s
+                yawn_prob[mask] = self.rng.beta(y_a, y_b, int(mask.sum()))
+            np.clip(yawn_prob, 0, 1, out=yawn_prob)
+        else:
+            for s, state in enumerate(states):
+                (e_mu, e_sd, m_mu, m_sd, p_mu, p_sd,
+                 n_mu, n_sd, y_a, y_b, conf) = self.STATE_PARAMS[state]
+                mask = true_state_idx == s
+                n = int(mask.sum())
+                ear[mask] = self.rng.normal(e_mu, e_sd, n)
+                mar[mask] = self.rng.normal(m_mu, m_sd, n)
+                presence_dev[mask] = self.rng.normal(p_mu, p_sd, n)
+                nod_movement[mask] = self.rng.normal(n_mu, n_sd, n)
+                yawn_prob[mask] = self.rng.beta(y_a, y_b, n)
+                base_confidence[mask] = conf
+
+            # Ensure realistic bounds (clipped in place)
+            np.clip(ear, 0.10, 0.40, out=ear)
+            np.clip(mar, 0.05, 0.75, out=mar)
+            np.clip(presence_dev, 0, 120, out=presence_dev)
+            np.clip(nod_movement, 0, 45, out=nod_movement)
+            np.clip(yawn_prob, 0, 1, out=yawn_prob)
+
+        # Apply detection algorithms with high accuracy (matching your manual
+        # experience) - the four channels stack straight into a (4, N)
+        # boolean prediction matrix
+        Y_pred = np.stack((
+            ear < self.DROWSY_EAR_THRESHOLD,
+            (yawn_prob > self.YAWN_THRESHOLD) | (mar > 0.47),
+            presence_dev <= self.PRESENCE_DEVIATION_THRESHOLD,
+            nod_movement > self.NODDING_THRESHOLD,
+        ))
+
+        # Minimal error rates (drowsiness 1.5%, yawning 0.8%, presence 0.5%,
+        # nodding 2.5%) - one (4, N) mask drawn in a single call and applied
+        # with one fused XOR; the matching confidence penalties collapse into
+        # one product reduction over the channel axis
+        err_probs = np.array([[0.015], [0.008], [0.005], [0.025]])
+        err_penalty = np.array([[0.7], [0.6], [0.7], [0.8]])
+        err = self.rng.random((4, num_samples)) < err_probs
+        Y_pred ^= err
+
+        # Ground truth, stacked the same way as the predictions
+        Y_true = np.stack((
+            true_state_idx == states.index('drowsy'),
+            true_state_idx == states.index('yawning'),
+            true_state_idx != states.index('absent'),
+            true_state_idx == states.index('nodding'),
+        ))
+
+        # Realistic processing time - floor applied in place, no temporary
+        processing_times = self.rng.normal(0.032, 0.003, num_samples).astype(np.float32)
+        np.maximum(processing_times, 0.025, out=processing_times)
+
+        # FIXED: Realistic confidence calculation - fully vectorized.
+        # Lower confidence for errors, all four penalties in one reduction
+        base_confidence *= np.where(err, err_penalty, 1.0).prod(axis=0)
+
+        prediction_correct = (Y_pred == Y_true).all(axis=0)
+
+        noise_good = self.rng.normal(0, 0.03, num_samples)
+        noise_bad = self.rng.normal(0, 0.08, num_samples)  # Lower for incorrect
+        confidence = np.where(prediction_correct,
+                              base_confidence + noise_good,
+                              base_confidence * 0.6 + noise_bad)
+
+        # Ensure realistic confidence bounds
+        confidence = confidence.astype(np.float32, copy=False)
+        np.clip(confidence, 0.4, 0.98, out=confidence)
+
+        # The boolean/float32 arrays go out as-is; keeping them as ndarrays
+        # skips both tolist() unboxing here and the np.array() re-copy in
+        # calculate_metrics.
+        return {
+            'drowsiness': {'y_true': Y_true[0], 'y_pred': Y_pred[0]},
+            'yawning': {'y_true': Y_true[1], 'y_pred': Y_pred[1]},
+            'presence': {'y_true': Y_true[2], 'y_pred': Y_pred[2]},
+            'nodding': {'y_true': Y_true[3], 'y_pred': Y_pred[3]},
+            'processing_times': processing_times,
+            'confidence_scores': confidence,
+            'yawn_probabilities': yawn_prob,
+            'ear_values': ear,
+            'mar_values': mar,
+            'timestamps': time.time() + np.arange(num_samples) * 0.033
+        }
+
     def generate_calibrated_test_data(self, num_samples=1500):
         """Generate test data calibrated to match your actual manual testing experience"""
         print(f"🔧 Generating {num_samples} calibrated test samples...")
         print("📊 Calibrated to match actual manual testing performance")
-        
-        # Realistic state distribution based on actual usage patterns
-        states = ['normal', 'drowsy', 'yawning', 'absent', 'nodding']
-        state_probabilities = [0.52, 0.18, 0.12, 0.10, 0.08]  # More normal states in practice
-        
-        for i in range(num_samples):
-            start_time = time.time()
-            
-            # Select true state
-            true_state = np.random.choice(states, p=state_probabilities)
-            
-            # Generate realistic measurements that would give good performance
-            if true_state == 'normal':
-                # Normal awake person - should be detected correctly most of the time
-                ear = np.random.normal(0.285, 0.012)  # Consistent normal EAR
-                mar = np.random.normal(0.19, 0.02)    # Closed mouth
-                presence_dev = np.random.normal(12, 6) # Good face alignment
-                nod_movement = np.random.normal(2, 1.5) # Minimal movement
-                
-                # Normal state should give low yawn probability but high confidence
-                yawn_prob = np.random.beta(1, 12)     # Very low yawn probability
-                base_confidence = 0.92                # High confidence for normal state
-                
-            elif true_state == 'drowsy':
-                # Drowsy person - should be caught by EAR threshold
-                ear = np.random.normal(0.18, 0.015)   # Well below threshold
-                mar = np.random.normal(0.18, 0.025)   # Slightly open mouth
-                presence_dev = np.random.normal(18, 10) # Still facing camera
-                nod_movement = np.random.normal(9, 4)   # Some head dropping
-                
-                yawn_prob = np.random.beta(2, 8)      # Some yawn probability
-                base_confidence = 0.89                # High confidence when clearly drowsy
-                
-            elif true_state == 'yawning':
-                # Actually yawning - should be detected with high accuracy
-                ear = np.random.normal(0.275, 0.02)   # Normal/slightly tired eyes
-                mar = np.random.normal(0.55, 0.05)    # Wide open mouth
-                presence_dev = np.random.normal(15, 8) # Present and facing camera
-                nod_movement = np.random.normal(3, 2)  # Minimal nodding during yawn
-                
-                # High yawn probability when actually yawning
-                yawn_prob = np.random.beta(9, 2)      # Very high probability
-                base_confidence = 0.94                # Very high confidence for clear yawns
-                
-            elif true_state == 'absent':
-                # Person not present or looking away - should be detected reliably
-                ear = np.random.normal(0.270, 0.035)  # Variable EAR (partial face)
-                mar = np.random.normal(0.21, 0.04)    # Variable mouth
-                presence_dev = np.random.normal(85, 20) # Well above threshold
-                nod_movement = np.random.normal(5, 4)   # Variable movement
-                
-                yawn_prob = np.random.beta(1, 15)     # Very low (no clear mouth)
-                base_confidence = 0.88                # High confidence when clearly absent
-                
-            else:  # nodding
-                # Head nodding - more challenging but still detectable
-                ear = np.random.normal(0.265, 0.025)  # Slightly tired eyes
-                mar = np.random.normal(0.20, 0.03)    # Normal mouth
-                presence_dev = np.random.normal(32, 12) # Some misalignment
-                nod_movement = np.random.normal(28, 7)  # Well above threshold
-                
-                yawn_prob = np.random.beta(2, 10)     # Low yawn probability
-                base_confidence = 0.82                # Moderate confidence for nodding
-            
-            # Ensure realistic bounds
-            ear = np.clip(ear, 0.10, 0.40)
-            mar = np.clip(mar, 0.05, 0.75)
-            presence_dev = np.clip(presence_dev, 0, 120)
-            nod_movement = np.clip(nod_movement, 0, 45)
-            yawn_prob = np.clip(yawn_prob, 0, 1)
-            
-            # Apply detection algorithms with high accuracy (matching your manual experience)
-            pred_drowsy = ear < self.DROWSY_EAR_THRESHOLD
-            pred_yawn = (yawn_prob > self.YAWN_THRESHOLD) or (mar > 0.47)
-            pred_present = presence_dev <= self.PRESENCE_DEVIATION_THRESHOLD
-            pred_nodding = nod_movement > self.NODDING_THRESHOLD
-            
-            # Minimal error rates - system works well when properly calibrated
-            if np.random.random() < 0.015:  # 1.5% error for drowsiness
-                pred_drowsy = not pred_drowsy
-                base_confidence *= 0.7  # Lower confidence for errors
-                
-            if np.random.random() < 0.008:  # 0.8% error for yawning (very accurate)
-                pred_yawn = not pred_yawn
-                base_confidence *= 0.6
-                
-            if np.random.random() < 0.005:  # 0.5% error for presence (most reliable)
-                pred_present = not pred_present
-                base_confidence *= 0.7
-                
-            if np.random.random() < 0.025:  # 2.5% error for nodding (most challenging)
-                pred_nodding = not pred_nodding
-                base_confidence *= 0.8
-            
-            # Ground truth
-            true_drowsy = true_state == 'drowsy'
-            true_yawn = true_state == 'yawning'
-            true_present = true_state != 'absent'
-            true_nodding = true_state == 'nodding'
-            
-            # Store results
-            self.results['drowsiness']['y_true'].append(true_drowsy)
-            self.results['drowsiness']['y_pred'].append(pred_drowsy)
-            
-            self.results['yawning']['y_true'].append(true_yawn)
-            self.results['yawning']['y_pred'].append(pred_yawn)
-            
-            self.results['presence']['y_true'].append(true_present)
-            self.results['presence']['y_pred'].append(pred_present)
-            
-            self.results['nodding']['y_true'].append(true_nodding)
-            self.results['nodding']['y_pred'].append(pred_nodding)
-            
-            # Realistic processing time
-            processing_time = np.random.normal(0.032, 0.003)  # Consistent ~32ms
-            processing_time = max(0.025, processing_time)
-            
-            # FIXED: Realistic confidence calculation
-            # Adjust confidence based on prediction quality
-            prediction_correct = (
-                (pred_drowsy == true_drowsy) and
-                (pred_yawn == true_yawn) and
-                (pred_present == true_present) and
-                (pred_nodding == true_nodding)
-            )
-            
-            if prediction_correct:
-                confidence = base_confidence + np.random.normal(0, 0.03)
-            else:
-                confidence = base_confidence * 0.6 + np.random.normal(0, 0.08)  # Lower for incorrect
-            
-            # Ensure realistic confidence bounds
-            confidence = np.clip(confidence, 0.4, 0.98)
-            
-            # Store detailed metrics
-            self.results['processing_times'].append(processing_time)
-            self.results['confidence_scores'].append(confidence)
-            self.results['yawn_probabilities'].append(yawn_prob)
-            self.results['ear_values'].append(ear)
-            self.results['mar_values'].append(mar)
-            self.results['timestamps'].append(time.time() + i * 0.033)
-            
-            # Progress indicator
-            if (i + 1) % 300 == 0:
-                print(f"  Generated {i + 1}/{num_samples} samples...")
-        
+
+        self.num_samples = num_samples
+
+        if num_samples >= self.PARALLEL_MIN_SAMPLES:
+            # Samples are independent, so large runs fan out across
+            # processes - each worker gets its own seeded Generator and a
+            # slice of the total, and the slices concatenate afterwards
+            workers = os.cpu_count() or 1
+            counts = [num_samples // workers] * workers
+            counts[0] += num_samples - sum(counts)
+            seeds = self.rng.integers(0, 2**63 - 1, size=workers)
+            with multiprocessing.Pool(workers) as pool:
+                parts = pool.map(_generate_chunk, list(zip(seeds.tolist(), counts)))
+
+            for key in ('drowsiness', 'yawning', 'presence', 'nodding'):
+                for field in ('y_true', 'y_pred'):
+                    self.results[key][field] = np.concatenate(
+                        [part[key][field] for part in parts])
+            for key in ('processing_times', 'confidence_scores',
+                        'yawn_probabilities', 'ear_values', 'mar_values',
+                        'timestamps'):
+                self.results[key] = np.concatenate([part[key] for part in parts])
+        else:
+            self.results.update(self._generate_arrays(num_samples))
+
         print("✅ Calibrated test data generated successfully!")
-        
+
         # Print realistic distribution
-        total_samples = len(self.results['drowsiness']['y_true'])
-        drowsy_count = sum(self.results['drowsiness']['y_true'])
-        yawn_count = sum(self.results['yawning']['y_true'])
-        absent_count = total_samples - sum(self.results['presence']['y_true'])
-        nod_count = sum(self.results['nodding']['y_true'])
+        total_samples = num_samples
+        true_drowsy = self.results['drowsiness']['y_true']
+        true_yawn = self.results['yawning']['y_true']
+        true_present = self.results['presence']['y_true']
+        true_nodding = self.results['nodding']['y_true']
+        drowsy_count = int(true_drowsy.sum())
+        yawn_count = int(true_yawn.sum())
+        absent_count = total_samples - int(true_present.sum())
+        nod_count = int(true_nodding.sum())
         normal_count = total_samples - drowsy_count - yawn_count - absent_count - nod_count
         
         print(f"📊 Calibrated Data Distribution:")
@@ -202,8 +235,8 @@ class FixedRealisticTester:
         print(f"  Nodding: {nod_count} ({nod_count/total_samples:.1%})")
         
         # Print CORRECTED confidence statistics
-        confidence_scores = np.array(self.results['confidence_scores'])
-        yawn_probs = np.array(self.results['yawn_probabilities'])
+        confidence_scores = self.results['confidence_scores']
+        yawn_probs = self.results['yawn_probabilities']
         
         print(f"📈 CORRECTED Confidence Metrics:")
         print(f"  Average Confidence: {np.mean(confidence_scores):.3f} (was 0.51)")
@@ -214,84 +247,111 @@ class FixedRealisticTester:
     def calculate_metrics(self):
         """Calculate performance metrics"""
         print("📊 Calculating calibrated performance metrics...")
-        
+
         metrics = {}
         detection_types = ['drowsiness', 'yawning', 'presence', 'nodding']
-        
-        for detection_type in detection_types:
-            y_true = self.results[detection_type]['y_true']
-            y_pred = self.results[detection_type]['y_pred']
-            
-            if len(y_true) == 0:
-                continue
-            
-            precision = precision_score(y_true, y_pred, average='binary', zero_division=0)
-            recall = recall_score(y_true, y_pred, average='binary', zero_division=0)
-            f1 = f1_score(y_true, y_pred, average='binary', zero_division=0)
-            accuracy = accuracy_score(y_true, y_pred)
-            
-            tn, fp, fn, tp = confusion_matrix(y_true, y_pred).ravel()
-            specificity = tn / (tn + fp) if (tn + fp) > 0 else 0
-            
-            metrics[detection_type] = {
-                'precision': precision,
-                'recall': recall,
-                'f1_score': f1,
-                'accuracy': accuracy,
-                'specificity': specificity,
-                'true_positives': int(tp),
-                'true_negatives': int(tn),
-                'false_positives': int(fp),
-                'false_negatives': int(fn)
-            }
-        
-        # Overall metrics
-        all_true = []
-        all_pred = []
-        for detection_type in detection_types:
-            all_true.extend(self.results[detection_type]['y_true'])
-            all_pred.extend(self.results[detection_type]['y_pred'])
-        
-        if len(all_true) > 0:
+
+        if len(self.results['drowsiness']['y_true']) > 0:
+            # Stack the four channels into (4, N) boolean matrices so each
+            # confusion cell for every detection type comes out of a single
+            # contiguous count_nonzero pass, and derive the scores as
+            # length-4 arrays in one go
+            Y_true = np.stack([self.results[k]['y_true'] for k in detection_types])
+            Y_pred = np.stack([self.results[k]['y_pred'] for k in detection_types])
+
+            tp = np.count_nonzero(Y_true & Y_pred, axis=1)
+            tn = np.count_nonzero(~Y_true & ~Y_pred, axis=1)
+            fp = np.count_nonzero(~Y_true & Y_pred, axis=1)
+            fn = np.count_nonzero(Y_true & ~Y_pred, axis=1)
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+                recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+                f1 = np.where(precision + recall > 0,
+                              2 * precision * recall / (precision + recall), 0.0)
+                specificity = np.where(tn + fp > 0, tn / (tn + fp), 0.0)
+            accuracy = (tp + tn) / Y_true.shape[1]
+
+            for i, detection_type in enumerate(detection_types):
+                metrics[detection_type] = {
+                    'precision': float(precision[i]),
+                    'recall': float(recall[i]),
+                    'f1_score': float(f1[i]),
+                    'accuracy': float(accuracy[i]),
+                    'specificity': float(specificity[i]),
+                    'true_positives': int(tp[i]),
+                    'true_negatives': int(tn[i]),
+                    'false_positives': int(fp[i]),
+                    'false_negatives': int(fn[i])
+                }
+        
+            # Overall metrics - derived from the summed confusion counts, so
+            # the four channels never get re-concatenated or re-scanned.
+            # Reproduces sklearn's weighted average over the pooled binary
+            # labels: per-class scores weighted by class support.
+            tp_s, tn_s = int(tp.sum()), int(tn.sum())
+            fp_s, fn_s = int(fp.sum()), int(fn.sum())
+            total = 4 * Y_true.shape[1]
+            sup_pos = tp_s + fn_s
+            sup_neg = tn_s + fp_s
+
+            prec_pos = tp_s / (tp_s + fp_s) if (tp_s + fp_s) > 0 else 0
+            prec_neg = tn_s / (tn_s + fn_s) if (tn_s + fn_s) > 0 else 0
+            rec_pos = tp_s / sup_pos if sup_pos > 0 else 0
+            rec_neg = tn_s / sup_neg if sup_neg > 0 else 0
+            f1_pos = (2 * prec_pos * rec_pos / (prec_pos + rec_pos)
+                      if (prec_pos + rec_pos) > 0 else 0)
+            f1_neg = (2 * prec_neg * rec_neg / (prec_neg + rec_neg)
+                      if (prec_neg + rec_neg) > 0 else 0)
+
             metrics['overall'] = {
-                'precision': precision_score(all_true, all_pred, average='weighted', zero_division=0),
-                'recall': recall_score(all_true, all_pred, average='weighted', zero_division=0),
-                'f1_score': f1_score(all_true, all_pred, average='weighted', zero_division=0),
-                'accuracy': accuracy_score(all_true, all_pred)
+                'precision': (sup_pos * prec_pos + sup_neg * prec_neg) / total,
+                'recall': (sup_pos * rec_pos + sup_neg * rec_neg) / total,
+                'f1_score': (sup_pos * f1_pos + sup_neg * f1_neg) / total,
+                'accuracy': (tp_s + tn_s) / total
             }
         
         # System performance
-        if self.results['processing_times']:
-            processing_times = np.array(self.results['processing_times'])
+        if len(self.results['processing_times']) > 0:
+            processing_times = self.results['processing_times']
             avg_processing_time = np.mean(processing_times)
             fps = 1 / avg_processing_time
             
+            # Native floats throughout, so json.dump never needs a fallback
             metrics['system_performance'] = {
-                'avg_processing_time_ms': avg_processing_time * 1000,
-                'fps': fps,
+                'avg_processing_time_ms': float(avg_processing_time * 1000),
+                'fps': float(fps),
                 'memory_usage_mb': 162,  # Realistic estimate
                 'cpu_utilization_percent': 24,  # Realistic estimate
-                'min_processing_time_ms': np.min(processing_times) * 1000,
-                'max_processing_time_ms': np.max(processing_times) * 1000,
-                'std_processing_time_ms': np.std(processing_times) * 1000
+                'min_processing_time_ms': float(np.min(processing_times) * 1000),
+                'max_processing_time_ms': float(np.max(processing_times) * 1000),
+                'std_processing_time_ms': float(np.std(processing_times) * 1000)
             }
         
         # CORRECTED analytics metrics
-        if self.results['confidence_scores']:
-            confidence_scores = np.array(self.results['confidence_scores'])
-            yawn_probs = np.array(self.results['yawn_probabilities'])
+        if len(self.results['confidence_scores']) > 0:
+            confidence_scores = self.results['confidence_scores']
+            yawn_probs = self.results['yawn_probabilities']
             
+            # One bucketed histogram pass gives all four confidence bands
+            # instead of four separate boolean scans over the same array.
+            # Bin edges are half-open; continuous scores never land exactly
+            # on an edge, and the top edge sits above the 0.98 clip.
+            n = self.num_samples
+            band_counts, _ = np.histogram(
+                confidence_scores, bins=np.array([0.0, 0.6, 0.8, 0.9, 1.001]))
+
             metrics['analytics'] = {
-                'avg_confidence_score': np.mean(confidence_scores),
-                'confidence_std': np.std(confidence_scores),
-                'high_confidence_rate': np.mean(confidence_scores > 0.8),
-                'very_high_confidence_rate': np.mean(confidence_scores > 0.9),
-                'medium_confidence_rate': np.mean((confidence_scores > 0.6) & (confidence_scores <= 0.8)),
-                'low_confidence_rate': np.mean(confidence_scores <= 0.6),
-                'avg_yawn_probability': np.mean(yawn_probs),
-                'high_yawn_confidence_rate': np.mean(yawn_probs > 0.7),
-                'total_test_samples': len(confidence_scores),
-                'test_duration_seconds': len(self.results['timestamps']) * 0.033
+                'avg_confidence_score': float(np.mean(confidence_scores)),
+                'confidence_std': float(np.std(confidence_scores)),
+                'high_confidence_rate': float((band_counts[2] + band_counts[3]) / n),
+                'very_high_confidence_rate': float(band_counts[3] / n),
+                'medium_confidence_rate': float(band_counts[1] / n),
+                'low_confidence_rate': float(band_counts[0] / n),
+                'avg_yawn_probability': float(np.mean(yawn_probs)),
+                'high_yawn_confidence_rate': float(np.mean(yawn_probs > 0.7)),
+                'total_test_samples': n,
+                'test_duration_seconds': n * 0.033
             }
         
         return metrics
@@ -323,18 +383,20 @@ class FixedRealisticTester:
             if detection_type in metrics:
                 m = metrics[detection_type]
                 display_name = type_mapping[detection_type]
-                precision = f"{m['precision']:.2f}"
-                recall = f"{m['recall']:.2f}" 
-                f1_score = f"{m['f1_score']:.2f}"
-                accuracy = f"{m['accuracy']:.1%}"
-                
-                print(f"| {display_name:<14} | {precision:>9} | {recall:>6} | {f1_score:>8} | {accuracy:>8} |")
-                
+                # Format only for the printed table; the CSV rows keep the
+                # raw floats instead of re-parsing the rounded strings
+                precision_str = f"{m['precision']:.2f}"
+                recall_str = f"{m['recall']:.2f}"
+                f1_str = f"{m['f1_score']:.2f}"
+                accuracy_str = f"{m['accuracy']:.1%}"
+
+                print(f"| {display_name:<14} | {precision_str:>9} | {recall_str:>6} | {f1_str:>8} | {accuracy_str:>8} |")
+
                 table_data.append({
                     'Detection Type': display_name,
-                    'Precision': float(precision),
-                    'Recall': float(recall),
-                    'F1-Score': float(f1_score),
+                    'Precision': m['precision'],
+                    'Recall': m['recall'],
+                    'F1-Score': m['f1_score'],
                     'Accuracy': m['accuracy']
                 })
         
@@ -401,7 +463,7 @@ class FixedRealisticTester:
         # Save results
         results_file = 'CORRECTED_performance_metrics.json'
         with open(results_file, 'w') as f:
-            json.dump(metrics, f, indent=2, default=str)
+            json.dump(metrics, f, indent=2)
         
         table_file = 'CORRECTED_research_paper_table.csv'
         pd.DataFrame(table_data).to_csv(table_file, index=False)
@@ -441,6 +503,13 @@ class FixedRealisticTester:
         
         return metrics, table_data
 
+def _generate_chunk(args):
+    """Pool worker: generate one slice of samples with its own seeded RNG."""
+    seed, n = args
+    tester = FixedRealisticTester()
+    tester.rng = np.random.default_rng(seed)
+    return tester._generate_arrays(n)
+
 if __name__ == "__main__":
     print("🔬 CORRECTED ATTENTION MONITORING SYSTEM TESTING")
     print("="*80)
@@ -0,0 +1,33 @@
+"""
+Numba kernels for the performance tester.
+
+Importing this module requires numba; callers should treat an ImportError
+as "run the plain NumPy path instead".
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def fill_state_samples(state_idx, params, z_ear, z_mar, z_pres, z_nod,
+                       ear, mar, presence_dev, nod_movement, base_confidence):
+    """Fill the per-sample measurement arrays in one fused parallel pass.
+
+    params is a (num_states, 9) array of ear mu/sd, mar mu/sd, presence
+    mu/sd, nod mu/sd and base confidence. The z_* inputs are pre-drawn
+    standard normals, so the caller's Generator stays the single source of
+    randomness; this kernel only does the per-state scale/shift and the
+    bounds clamping, with no intermediate allocations.
+    """
+    for i in prange(state_idx.shape[0]):
+        s = state_idx[i]
+        e = params[s, 0] + params[s, 1] * z_ear[i]
+        m = params[s, 2] + params[s, 3] * z_mar[i]
+        p = params[s, 4] + params[s, 5] * z_pres[i]
+        n = params[s, 6] + params[s, 7] * z_nod[i]
+        ear[i] = min(max(e, 0.10), 0.40)
+        mar[i] = min(max(m, 0.05), 0.75)
+        presence_dev[i] = min(max(p, 0.0), 120.0)
+        nod_movement[i] = min(max(n, 0.0), 45.0)
+        base_confidence[i] = params[s, 8]